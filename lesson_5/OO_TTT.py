@@ -1,5 +1,7 @@
+import functools
 import random
 import os
+from collections.abc import Mapping
 
 
 def clear_screen():
@@ -29,38 +31,177 @@ class Square:
         return self.marker == Square.INITIAL_MARKER
 
 
+class SquaresView(Mapping):
+    # Board.squares for boards that keep no Square objects; the squares
+    # handed out are copies, so marking one never changes the board
+    def __init__(self, board):
+        self.board = board
+
+    def __getitem__(self, key):
+        if key not in self.board.keys:
+            raise KeyError(key)
+
+        return Square(self.board.marker_at(key))
+
+    def __iter__(self):
+        return iter(self.board.keys)
+
+    def __len__(self):
+        return len(self.board.keys)
+
+
+@functools.lru_cache(maxsize=None)
+def generate_winning_rows(size, win_length):
+    rows = []
+
+    for row_step, col_step in ((0, 1), (1, 0), (1, 1), (1, -1)):
+        for row in range(size):
+            for col in range(size):
+                end_row = row + row_step * (win_length - 1)
+                end_col = col + col_step * (win_length - 1)
+                if not (0 <= end_row < size and 0 <= end_col < size):
+                    continue
+                rows.append(tuple(
+                    (row + row_step * step) * size
+                    + (col + col_step * step) + 1
+                    for step in range(win_length)
+                ))
+
+    return tuple(rows)
+
+
+@functools.lru_cache(maxsize=None)
+def winning_row_indices_by_square(size, win_length):
+    indices_by_square = {key: [] for key in range(1, size * size + 1)}
+
+    for index, row in enumerate(generate_winning_rows(size, win_length)):
+        for key in row:
+            indices_by_square[key].append(index)
+
+    return {key: tuple(indices)
+            for key, indices in indices_by_square.items()}
+
+
+@functools.lru_cache(maxsize=None)
+def winning_row_indices(size, win_length):
+    rows = generate_winning_rows(size, win_length)
+    return {row: index for index, row in enumerate(rows)}
+
+
+@functools.lru_cache(maxsize=None)
+def winning_row_masks(size, win_length):
+    return {row: sum(1 << (key - 1) for key in row)
+            for row in generate_winning_rows(size, win_length)}
+
+
+@functools.lru_cache(maxsize=None)
+def winning_line_masks(size, win_length):
+    return tuple(winning_row_masks(size, win_length).values())
+
+
+@functools.lru_cache(maxsize=None)
+def winning_masks_by_square(size, win_length):
+    masks = winning_line_masks(size, win_length)
+    return {key: tuple(masks[index] for index in indices)
+            for key, indices
+            in winning_row_indices_by_square(size, win_length).items()}
+
+
+# the classic 3x3 game, which the exact engines solve on 9-bit masks
+CLASSIC_SIZE = 3
+CLASSIC_SQUARES = tuple(range(1, CLASSIC_SIZE * CLASSIC_SIZE + 1))
+CLASSIC_FULL_MASK = (1 << len(CLASSIC_SQUARES)) - 1
+CLASSIC_LINE_MASKS = winning_line_masks(CLASSIC_SIZE, CLASSIC_SIZE)
+
+
+def mask_line_holdings(own, other, line_masks):
+    # (own, other) marker counts of the rows only one side has marked
+    holdings = []
+    for line in line_masks:
+        mine, theirs = own & line, other & line
+        if mine and not theirs:
+            holdings.append((mine.bit_count(), 0))
+        elif theirs and not mine:
+            holdings.append((0, theirs.bit_count()))
+
+    return holdings
+
+
+def is_classic_line(mask):
+    for line in CLASSIC_LINE_MASKS:
+        if mask & line == line:
+            return True
+
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def zobrist_table(size, marker):
+    rng = random.Random(f"zobrist:{size}:{marker}")
+    return tuple(rng.getrandbits(64) for _ in range(size * size))
+
+
 class Board:
-    def __init__(self):
+    POSSIBLE_WINNING_ROWS = generate_winning_rows(3, 3)
+
+    def __init__(self, size=3, win_length=3):
+        self.size = size
+        self.win_length = win_length
+        self.square_lines = winning_row_indices_by_square(size, win_length)
         self.reset()
 
     def reset(self):
-        self.squares = {key: Square() for key in range(1, 10)}
+        self.squares = {key: Square() for key in self.keys}
+        self.reset_line_counts()
+        self.reset_move_stack()
+
+    def reset_move_stack(self):
+        self.move_stack = []
+        self.last_key = None
+        self.zobrist_hash = 0
+
+    def reset_line_counts(self):
+        # per-marker counts of each winning row, kept current on every mark
+        self.line_counts = {}
+        self.line_totals = [0] * len(self.winning_rows)
+        self.critical_lines = {}
+        self.completed_lines = {}
+
+    @property
+    def keys(self):
+        return range(1, self.size * self.size + 1)
+
+    @property
+    def winning_rows(self):
+        return generate_winning_rows(self.size, self.win_length)
+
+    def rows_through(self, key):
+        return tuple(self.winning_rows[index]
+                     for index in self.square_lines[key])
+
+    @property
+    def center_square(self):
+        if self.size % 2 == 0:
+            return None
+
+        return (self.size * self.size + 1) // 2
+
+    def marker_at(self, key):
+        return self.squares[key].marker
 
     def display(self):
+        spacer = "|".join(["     "] * self.size)
+        divider = "+".join(["-----"] * self.size)
+
         print()
-        print("     |     |")
-        print(
-            f"  {self.squares[1]}  |"
-            f"  {self.squares[2]}  |"
-            f"  {self.squares[3]}"
-        )
-        print("     |     |")
-        print("-----+-----+-----")
-        print("     |     |")
-        print(
-            f"  {self.squares[4]}  |"
-            f"  {self.squares[5]}  |"
-            f"  {self.squares[6]}"
-        )
-        print("     |     |")
-        print("-----+-----+-----")
-        print("     |     |")
-        print(
-            f"  {self.squares[7]}  |"
-            f"  {self.squares[8]}  |"
-            f"  {self.squares[9]}"
-        )
-        print("     |     |")
+        for start in range(1, self.size * self.size + 1, self.size):
+            if start > 1:
+                print(divider)
+            markers = [self.marker_at(key)
+                       for key in range(start, start + self.size)]
+            print(spacer)
+            print("|".join(f"  {marker}  " for marker in markers))
+            print(spacer)
         print()
 
     def display_with_clear(self):
@@ -69,11 +210,85 @@ class Board:
         self.display()
 
     def count_markers_for(self, player, keys):
-        markers = [self.squares[key].marker for key in keys]
+        index = winning_row_indices(self.size, self.win_length).get(keys)
+        if index is not None:
+            counts = self.line_counts.get(player.marker)
+            return counts[index] if counts is not None else 0
+
+        markers = [self.marker_at(key) for key in keys]
         return markers.count(player.marker)
 
-    def mark_square_at(self, key, marker):
+    def add_marker_counts(self, key, marker):
+        if marker not in self.line_counts:
+            self.line_counts[marker] = [0] * len(self.line_totals)
+            self.critical_lines[marker] = set()
+            self.completed_lines[marker] = 0
+
+        counts = self.line_counts[marker]
+        totals = self.line_totals
+        threat = self.win_length - 1
+        for index in self.square_lines[key]:
+            counts[index] += 1
+            totals[index] += 1
+            if totals[index] == threat and counts[index] == threat:
+                self.critical_lines[marker].add(index)
+            elif totals[index] == self.win_length:
+                for lines in self.critical_lines.values():
+                    lines.discard(index)
+                if counts[index] == self.win_length:
+                    self.completed_lines[marker] += 1
+
+    def remove_marker_counts(self, key, marker):
+        counts = self.line_counts[marker]
+        totals = self.line_totals
+        threat = self.win_length - 1
+        for index in self.square_lines[key]:
+            if counts[index] == self.win_length:
+                self.completed_lines[marker] -= 1
+            counts[index] -= 1
+            totals[index] -= 1
+            if totals[index] == threat:
+                for other, lines in self.critical_lines.items():
+                    if self.line_counts[other][index] == threat:
+                        lines.add(index)
+            elif totals[index] == threat - 1:
+                self.critical_lines[marker].discard(index)
+
+    def zobrist_key(self, key, marker):
+        return zobrist_table(self.size, marker)[key - 1]
+
+    def line_holdings(self, marker, opponent_marker):
+        # (own, other) marker counts of the rows only one side has marked
+        empty = [0] * len(self.line_totals)
+        own = self.line_counts.get(marker, empty)
+        other = self.line_counts.get(opponent_marker, empty)
+        return [(mine, theirs) for mine, theirs in zip(own, other)
+                if not (mine and theirs) and mine != theirs]
+
+    def place_marker(self, key, marker):
         self.squares[key].marker = marker
+        self.add_marker_counts(key, marker)
+
+    def clear_marker(self, key, marker):
+        self.squares[key].marker = Square.INITIAL_MARKER
+        self.remove_marker_counts(key, marker)
+
+    def make_move(self, key, marker):
+        self.place_marker(key, marker)
+        self.zobrist_hash ^= self.zobrist_key(key, marker)
+        self.move_stack.append(key)
+        self.last_key = key
+
+    def undo_move(self):
+        key = self.move_stack.pop()
+        marker = self.marker_at(key)
+        self.clear_marker(key, marker)
+        self.zobrist_hash ^= self.zobrist_key(key, marker)
+        self.last_key = self.move_stack[-1] if self.move_stack else None
+        return key
+
+    def mark_square_at(self, key, marker):
+        self.make_move(key, marker)
 
     def unused_squares(self):
         return [key for key, square in self.squares.items()
@@ -85,6 +300,154 @@ class Board:
     def is_full(self):
         return len(self.unused_squares()) == 0
 
+    def is_winner(self, player):
+        return self.completed_lines.get(player.marker, 0) > 0
+
+    def find_critical_square(self, marker):
+        lines = self.critical_lines.get(marker)
+        if not lines:
+            return None
+
+        for key in self.winning_rows[min(lines)]:
+            if self.is_unused_square(key):
+                return key
+
+        return None
+
+    def last_move_wins(self):
+        if self.last_key is None:
+            return False
+
+        counts = self.line_counts[self.marker_at(self.last_key)]
+        for index in self.square_lines[self.last_key]:
+            if counts[index] == self.win_length:
+                return True
+
+        return False
+
+
+class BitBoard(Board):
+    UNUSED_SQUARES = tuple(
+        tuple(key for key in range(1, 10) if free & (1 << (key - 1)))
+        for free in range(1 << 9)
+    )
+
+    def __init__(self, size=3, win_length=3):
+        self.full_mask = (1 << (size * size)) - 1
+        # the mask tables are shared by every board of the same shape;
+        # wins are read straight off the masks of the rows through a square
+        self.row_masks = winning_row_masks(size, win_length)
+        self.line_masks = winning_line_masks(size, win_length)
+        self.square_masks = winning_masks_by_square(size, win_length)
+        super().__init__(size, win_length)
+
+    @staticmethod
+    def mask_of(keys):
+        return sum(1 << (key - 1) for key in keys)
+
+    def reset(self):
+        # the masks answer every line question, so no line counters are kept
+        self.masks = {}
+        self.occupied = 0
+        self.reset_move_stack()
+
+    @property
+    def squares(self):
+        return SquaresView(self)
+
+    def marker_at(self, key):
+        bit = 1 << (key - 1)
+        for marker, mask in self.masks.items():
+            if mask & bit:
+                return marker
+
+        return Square.INITIAL_MARKER
+
+    def mask_for(self, marker):
+        return self.masks.get(marker, 0)
+
+    def count_markers_for(self, player, keys):
+        row_mask = self.row_masks.get(keys)
+        if row_mask is None:
+            row_mask = BitBoard.mask_of(keys)
+
+        return (self.mask_for(player.marker) & row_mask).bit_count()
+
+    def line_holdings(self, marker, opponent_marker):
+        return mask_line_holdings(self.mask_for(marker),
+                                  self.mask_for(opponent_marker),
+                                  self.line_masks)
+
+    def place_marker(self, key, marker):
+        bit = 1 << (key - 1)
+        self.masks[marker] = self.mask_for(marker) | bit
+        self.occupied |= bit
+
+    def clear_marker(self, key, marker):
+        bit = 1 << (key - 1)
+        self.masks[marker] &= ~bit
+        self.occupied &= ~bit
+
+    def unused_squares(self):
+        free = self.full_mask & ~self.occupied
+        if self.full_mask < len(BitBoard.UNUSED_SQUARES):
+            return list(BitBoard.UNUSED_SQUARES[free])
+
+        keys = []
+        while free:
+            lowest = free & -free
+            keys.append(lowest.bit_length())
+            free ^= lowest
+
+        return keys
+
+    def is_unused_square(self, key):
+        return not self.occupied & (1 << (key - 1))
+
+    def is_full(self):
+        return self.occupied == self.full_mask
+
+    def is_winner(self, player):
+        mask = self.mask_for(player.marker)
+        for line in self.line_masks:
+            if mask & line == line:
+                return True
+
+        return False
+
+    def last_move_wins(self):
+        if self.last_key is None:
+            return False
+
+        mask = self.mask_for(self.marker_at(self.last_key))
+        for line in self.square_masks[self.last_key]:
+            if mask & line == line:
+                return True
+
+        return False
+
+    def find_critical_square(self, marker):
+        mask = self.mask_for(marker)
+        threat = self.win_length - 1
+        for line in self.line_masks:
+            free = line & ~self.occupied
+            if free and (mask & line).bit_count() == threat:
+                return free.bit_length()
+
+        return None
+
+
+def is_classic_board(board):
+    return (board.size, board.win_length) == (CLASSIC_SIZE, CLASSIC_SIZE)
+
+
+def classic_mask_for(board, marker):
+    if isinstance(board, BitBoard):
+        return board.mask_for(marker)
+
+    return sum(1 << (key - 1) for key in CLASSIC_SQUARES
+                              if board.marker_at(key) == marker)
+
 
 class Player:
     def __init__(self, marker):
@@ -121,22 +484,40 @@ class Computer(Player):
         super().__init__(Square.COMPUTER_MARKER)
 
 
+class RandomEngine:
+    def __init__(self, rng=random):
+        self.rng = rng
+
+    def choose_square(self, board, _marker, _opponent_marker):
+        return self.rng.choice(board.unused_squares())
+
+
+class HeuristicEngine(RandomEngine):
+    def choose_square(self, board, marker, opponent_marker):
+        choice = board.find_critical_square(marker)
+
+        if not choice:
+            choice = board.find_critical_square(opponent_marker)
+        if not choice:
+            center = board.center_square
+            if center and board.is_unused_square(center):
+                choice = center
+        if not choice:
+            choice = super().choose_square(board, marker, opponent_marker)
+
+        return choice
+
+
 class TTTGame:
     MATCH_GOAL = 3
-    MIDDLE_SQUARE = 5
-    POSSIBLE_WINNING_ROWS = (
-        (1, 2, 3),
-        (4, 5, 6),
-        (7, 8, 9),
-        (1, 4, 7),
-        (2, 5, 8),
-        (3, 6, 9),
-        (1, 5, 9),
-        (3, 5, 7),
-    )
 
-    def __init__(self):
-        self.board = Board()
+    def __init__(self, board_class=Board, engine=None,
+                 size=3, win_length=3):
+        self.board = board_class(size, win_length)
+        self.engine = engine
+        # answers whenever the engine has no move for this board
+        self.fallback = HeuristicEngine()
+        self.recorder = None
         self.human = Human()
         self.computer = Computer()
         self.first_player = self.human
@@ -226,6 +607,11 @@ class TTTGame:
 
         self.board.display_with_clear()
         self.display_results()
+        self.record_game()
+
+    def record_game(self):
+        if self.recorder:
+            self.recorder.record_game(self)
 
     def play_again(self):
         while True:
@@ -256,11 +642,7 @@ class TTTGame:
             print("A tie game. How boring.")
 
     def is_winner(self, player):
-        for row in TTTGame.POSSIBLE_WINNING_ROWS:
-            if self.three_in_a_row(player, row):
-                return True
-
-        return False
+        return self.board.is_winner(player)
 
     def human_moves(self):
         valid_choices = self.board.unused_squares()
@@ -282,58 +664,27 @@ class TTTGame:
         self.board.mark_square_at(choice, self.human.marker)
 
     def computer_moves(self):
-        choice = self.offensive_computer_move()
+        choice = self.engine_computer_move()
 
         if not choice:
-            choice = self.defensive_computer_move()
-        if not choice:
-            choice = self.pick_center_square()
-        if not choice:
-            choice = self.pick_random_square()
+            choice = self.fallback.choose_square(
+                self.board, self.computer.marker, self.human.marker
+            )
 
         self.board.mark_square_at(choice, self.computer.marker)
 
-    def pick_center_square(self):
-        return (
-            TTTGame.MIDDLE_SQUARE
-            if self.board.is_unused_square(TTTGame.MIDDLE_SQUARE)
-            else None
-        )
-
-    def pick_random_square(self):
-        valid_choices = self.board.unused_squares()
-        return random.choice(valid_choices)
-
-    def find_critical_square(self, player):
-        for row in self.POSSIBLE_WINNING_ROWS:
-            key = self.critical_square(row, player)
-            if key:
-                return key
+    def engine_computer_move(self):
+        if not self.engine:
+            return None
 
-        return None
-
-    def critical_square(self, row, player):
-        if self.board.count_markers_for(player, row) == 2:
-            for key in row:
-                if self.board.is_unused_square(key):
-                    return key
-        return None
-
-    def defensive_computer_move(self):
-        return self.find_critical_square(self.human)
-
-    def offensive_computer_move(self):
-        return self.find_critical_square(self.computer)
-
-    def three_in_a_row(self, player, row):
-        return self.board.count_markers_for(player, row) == 3
-
-    def someone_won(self):
-        return self.is_winner(self.human) or self.is_winner(self.computer)
+        return self.engine.choose_square(
+            self.board, self.computer.marker, self.human.marker
+        )
 
     def is_game_over(self):
-        return self.board.is_full() or self.someone_won()
+        return self.board.is_full() or self.board.last_move_wins()
 
 
-game = TTTGame()
-game.play()
+if __name__ == "__main__":
+    game = TTTGame()
+    game.play()
@@ -1,3 +1,4 @@
+import functools
 import random
 import os
 import time
@@ -23,35 +24,66 @@ def press_to_continue():
 class Hand:
     def __init__(self):
         self._cards = []
+        self.reset_totals()
 
     @property
     def cards(self):
         return self._cards
 
+    def reset_totals(self):
+        # visible cards only, with every ace counted as 11
+        self._visible_cards = 0
+        self._total = 0
+        self._aces = 0
+
+    def count_value(self, value, step=1):
+        self._visible_cards += step
+        self._total += step * value
+        if value == Card.ACE_VALUE:
+            self._aces += step
+
     def add(self, card):
         self.cards.append(card)
+        if not card.hidden:
+            self.count_value(card.value())
 
     def reset(self):
         self._cards.clear()
+        self.reset_totals()
+
+    def card_values(self):
+        return [card.value() for card in self.cards if not card.hidden]
+
+    def codes(self):
+        return bytes([CompactCard.code_of(card) for card in self.cards])
+
+    def softened_aces(self):
+        excess = self._total - TwentyOneGame.TWENTY_ONE
+        if excess <= 0:
+            return 0
+
+        return min(self._aces, -(-excess // Card.FACE_VALUE))
 
     def value(self):
-        ranks = [card.rank for card in self.cards if not card.hidden]
-        if len(ranks) < 2:
+        if self._visible_cards < 2:
             return "unknown"
 
-        total = sum([card.value() for card in self.cards if not card.hidden])
-
-        for _ in range(ranks.count("A")):
-            if total > TwentyOneGame.TWENTY_ONE:
-                total -= Card.FACE_VALUE
+        return self._total - Card.FACE_VALUE * self.softened_aces()
 
-        return total
+    def is_soft(self):
+        return self._aces > self.softened_aces()
 
     def hide_card(self):
-        self.cards[-1].hide()
+        card = self.cards[-1]
+        if not card.hidden:
+            self.count_value(card.value(), -1)
+        card.hide()
 
     def reveal_card(self):
-        self.cards[-1].reveal()
+        card = self.cards[-1]
+        if card.hidden:
+            self.count_value(card.value())
+        card.reveal()
 
     def join_cards(self):
         return ", ".join([str(card) for card in self.cards])
@@ -104,11 +136,41 @@ class Card:
         return self.rank
 
 
+class CardCounter:
+    # tags by card value, 2 through 11 (ace)
+    HI_LO = {2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 0, 8: 0, 9: 0, 10: -1, 11: -1}
+    KO = {2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 1, 8: 0, 9: 0, 10: -1, 11: -1}
+    HI_OPT_II = {2: 1, 3: 1, 4: 2, 5: 2, 6: 1, 7: 1, 8: 0, 9: 0, 10: -2,
+                 11: 0}
+    OMEGA_II = {2: 1, 3: 1, 4: 2, 5: 2, 6: 2, 7: 1, 8: 0, 9: -1, 10: -2,
+                11: 0}
+    DECK_SIZE = 52
+
+    def __init__(self, tags=HI_LO):
+        self.tags = tuple(tags.get(value, 0)
+                          for value in range(Card.ACE_VALUE + 1))
+        self.running_count = 0
+
+    def add(self, value):
+        self.running_count += self.tags[value]
+
+    def reset(self):
+        self.running_count = 0
+
+    def true_count(self, cards_remaining):
+        if not cards_remaining:
+            return 0.0
+
+        return self.running_count * self.DECK_SIZE / cards_remaining
+
+
 class Deck:
     RANKS = tuple(range(2, 11)) + ("J", "Q", "K", "A")
     SUITS = ("♥", "♦", "♣", "♠")
 
-    def __init__(self):
+    def __init__(self, counter=None, rng=random):
+        self.counter = counter
+        self.rng = rng
         self.reset()
 
     def reset(self):
@@ -117,8 +179,14 @@ class Deck:
             for rank in self.__class__.RANKS
             for suit in self.__class__.SUITS
         ]
-        random.shuffle(cards)
+        self.rng.shuffle(cards)
         self.cards = cards
+        self.reset_count()
+
+    def reset_count(self):
+        self.hole_card = None
+        if self.counter:
+            self.counter.reset()
 
     @property
     def cards(self):
@@ -128,13 +196,151 @@ class Deck:
     def cards(self, cards):
         self._cards = cards
 
-    def deal_card(self, participant):
-        participant.hand.add(self.cards.pop())
+    @staticmethod
+    def value_of(card):
+        return card.value()
+
+    def next_card(self):
+        return self.cards.pop()
+
+    def draw(self, hidden=False):
+        card = self.next_card()
+        # a hidden card is only counted once it is revealed
+        if hidden:
+            self.hole_card = card
+        elif self.counter:
+            self.counter.add(self.value_of(card))
+
+        return card
+
+    def deal_card(self, participant, hidden=False):
+        participant.hand.add(self.draw(hidden))
+        if hidden:
+            participant.hand.hide_card()
+
+    def reveal_hole_card(self):
+        if self.counter and self.hole_card is not None:
+            self.counter.add(self.value_of(self.hole_card))
+        self.hole_card = None
+
+    @property
+    def running_count(self):
+        return self.counter.running_count
+
+    def true_count(self):
+        return self.counter.true_count(len(self.cards))
+
+    def is_low(self):
+        return len(self.cards) <= TwentyOneGame.CARDS_LEFT
+
+
+class CompactCard:
+    # a card is the code rank_index * 4 + suit_index, bit 6 marks it hidden
+    HIDDEN = 0x40
+    RANK = tuple(rank for rank in Deck.RANKS for _ in Deck.SUITS)
+    SUIT = tuple(suit for _ in Deck.RANKS for suit in Deck.SUITS)
+    VALUE = tuple(Card(rank, suit).value()
+                  for rank in Deck.RANKS for suit in Deck.SUITS)
+    CODES = bytes(range(len(RANK)))
+    VISIBLE = bytes(map((~HIDDEN).__and__, range(256)))
+
+    @staticmethod
+    def code_of(card):
+        return (Deck.RANKS.index(card.rank) * len(Deck.SUITS)
+                + Deck.SUITS.index(card.suit))
+
+    @staticmethod
+    def name(code):
+        if code & CompactCard.HIDDEN:
+            return "[hidden]"
+
+        return f"{CompactCard.RANK[code]}{CompactCard.SUIT[code]}"
+
+
+class CompactHand(Hand):
+    def __init__(self):
+        self._cards = bytearray()
+        self.reset_totals()
+
+    def add(self, card):
+        self.cards.append(card)
+        if not card & CompactCard.HIDDEN:
+            self.count_value(CompactCard.VALUE[card])
+
+    def card_values(self):
+        return [CompactCard.VALUE[code] for code in self.cards
+                if not code & CompactCard.HIDDEN]
+
+    def codes(self):
+        return bytes(self.cards.translate(CompactCard.VISIBLE))
+
+    def hide_card(self):
+        code = self.cards[-1]
+        if not code & CompactCard.HIDDEN:
+            self.count_value(CompactCard.VALUE[code], -1)
+            self.cards[-1] = code | CompactCard.HIDDEN
+
+    def reveal_card(self):
+        code = self.cards[-1]
+        if code & CompactCard.HIDDEN:
+            code &= ~CompactCard.HIDDEN
+            self.count_value(CompactCard.VALUE[code])
+            self.cards[-1] = code
+
+    def join_cards(self):
+        return ", ".join([CompactCard.name(code) for code in self.cards])
+
+
+class CompactDeck(Deck):
+    def __init__(self, counter=None, rng=random):
+        self.cards = bytearray(CompactCard.CODES)
+        super().__init__(counter, rng)
+
+    def reset(self):
+        # refill the same buffer rather than building new cards
+        self.cards[:] = CompactCard.CODES
+        self.rng.shuffle(self.cards)
+        self.reset_count()
+
+    @staticmethod
+    def value_of(card):
+        return CompactCard.VALUE[card]
+
+
+class Shoe(CompactDeck):
+    DECKS = 6
+
+    def __init__(self, decks=DECKS, counter=None, rng=random):
+        self._buffer = bytearray(CompactCard.CODES * decks)
+        self.cut_card = int(len(self._buffer) * TwentyOneGame.DECK_PENETRATION)
+        self.counter = counter
+        self.rng = rng
+        self.reset()
+
+    def reset(self):
+        # cards are shuffled lazily as they are dealt, so reshuffling only
+        # rewinds the cursor
+        self.cursor = 0
+        self.reset_count()
+
+    @property
+    def cards(self):
+        return memoryview(self._buffer)[self.cursor:]
+
+    def next_card(self):
+        buffer, cursor = self._buffer, self.cursor
+        swap = self.rng.randrange(cursor, len(buffer))
+        buffer[cursor], buffer[swap] = buffer[swap], buffer[cursor]
+        self.cursor = cursor + 1
+        return buffer[cursor]
+
+    def is_low(self):
+        return self.cursor >= self.cut_card
 
 
 class Player:
-    def __init__(self, balance):
-        self._hand = Hand()
+    def __init__(self, balance, hand_class=Hand):
+        self._hand = hand_class()
         self.balance = balance
 
     @property
@@ -166,47 +372,63 @@ class Player:
 
 
 class Dealer:
-    def __init__(self):
-        self._hand = Hand()
+    def __init__(self, hand_class=Hand):
+        self._hand = hand_class()
 
     @property
     def hand(self):
         return self._hand
 
 
-class TwentyOneGame:
-    PLAYER_BALANCE = 5
-    WINNING_BALANCE = PLAYER_BALANCE * 2
-    DECK_PENETRATION = 0.75 # playing with 75% penetration before reshuffle
-    CARDS_LEFT = int(52 * (1 - DECK_PENETRATION))
-    DEALER_STAY = 17
-    TWENTY_ONE = 21
+class ConsoleRenderer:
+    DEAL_DELAY = 1
 
-    def __init__(self):
-        self.deck = Deck()
-        self.player = Player(TwentyOneGame.PLAYER_BALANCE)
-        self.dealer = Dealer()
+    def prompt(self, msg):
+        prompt(msg)
 
-    @classmethod
-    def display_welcome_message(cls):
+    def clear_screen(self):
         clear_screen()
-        prompt("Welcome to Twenty One!")
-        prompt(
-            f"Your player balance is ${cls.PLAYER_BALANCE}. "
-            "Each round requires a bet of $1."
-        )
-        prompt(
-            "The game will end when you go broke "
-            f"or double your balance to ${cls.WINNING_BALANCE}."
-        )
-        prompt("Good luck!")
+
+    def display_underline(self):
+        display_underline()
+
+    def press_to_continue(self):
         press_to_continue()
 
-    @staticmethod
-    def display_goodbye_message():
-        clear_screen()
-        prompt("Thank you for playing. See you next time!")
+    def pause(self):
+        time.sleep(self.__class__.DEAL_DELAY)
+
 
+class NullRenderer(ConsoleRenderer):
+    def prompt(self, msg):
+        pass
+
+    def clear_screen(self):
+        pass
+
+    def display_underline(self):
+        pass
+
+    def press_to_continue(self):
+        pass
+
+    def pause(self):
+        pass
+
+
+class Strategy:
+    def __init__(self, sessions=1):
+        self.sessions = sessions
+
+    def should_hit(self, game):
+        raise NotImplementedError
+
+    def play_again(self, game):
+        self.sessions -= 1
+        return self.sessions > 0
+
+
+class HumanStrategy(Strategy):
     @staticmethod
     def _validate_decision(decision):
         while decision not in ("h", "hit", "s", "stay"):
@@ -223,38 +445,112 @@ class TwentyOneGame:
 
         return answer
 
+    def should_hit(self, game):
+        decision = input().strip().lower()
+        decision = HumanStrategy._validate_decision(decision)
+
+        return decision in ("hit", "h")
+
+    def play_again(self, game):
+        answer = input().strip().lower()
+        answer = HumanStrategy._validate_answer(answer)
+
+        return answer in ("yes", "y")
+
+
+class StayOnStrategy(Strategy):
+    def __init__(self, stay=17, sessions=1):
+        super().__init__(sessions)
+        self.stay = stay
+
+    def should_hit(self, game):
+        return game.player.hand.value() < self.stay
+
+
+class TwentyOneGame:
+    PLAYER_BALANCE = 5
+    WINNING_BALANCE = PLAYER_BALANCE * 2
+    DECK_PENETRATION = 0.75 # playing with 75% penetration before reshuffle
+    CARDS_LEFT = int(52 * (1 - DECK_PENETRATION))
+    DEALER_STAY = 17
+    TWENTY_ONE = 21
+    # every result determine_result can return
+    RESULTS = ("player_bust", "dealer_bust", "player_win", "dealer_win",
+               "tie")
+
+    def __init__(self, deck_class=Deck, hand_class=Hand, strategy=None,
+                 renderer=None, rng=random):
+        self.deck = deck_class(rng=rng)
+        self.player = Player(TwentyOneGame.PLAYER_BALANCE, hand_class)
+        self.dealer = Dealer(hand_class)
+        self.strategy = strategy or HumanStrategy()
+        self.renderer = renderer or ConsoleRenderer()
+        self.recorder = None
+
+    @classmethod
+    def compact(cls, strategy=None, renderer=None, rng=random):
+        return cls(CompactDeck, CompactHand, strategy, renderer, rng)
+
+    @classmethod
+    def with_shoe(cls, decks=Shoe.DECKS, strategy=None, renderer=None,
+                  counter=None, rng=random):
+        return cls(functools.partial(Shoe, decks, counter), CompactHand,
+                   strategy, renderer, rng)
+
+    def display_welcome_message(self):
+        self.renderer.clear_screen()
+        self.renderer.prompt("Welcome to Twenty One!")
+        self.renderer.prompt(
+            f"Your player balance is ${TwentyOneGame.PLAYER_BALANCE}. "
+            "Each round requires a bet of $1."
+        )
+        self.renderer.prompt(
+            "The game will end when you go broke "
+            f"or double your balance to ${TwentyOneGame.WINNING_BALANCE}."
+        )
+        self.renderer.prompt("Good luck!")
+        self.renderer.press_to_continue()
+
+    def display_goodbye_message(self):
+        self.renderer.clear_screen()
+        self.renderer.prompt("Thank you for playing. See you next time!")
+
     def deal_cards(self):
-        for _ in range(2):
+        for hole_card in (False, True):
             self.deck.deal_card(self.player)
-            self.deck.deal_card(self.dealer)
-
-        self.dealer.hand.hide_card()
+            self.deck.deal_card(self.dealer, hole_card)
 
     def display_hands(self):
-        prompt(f"Dealer's hand: {self.dealer.hand.join_cards()}")
-        prompt(f"Player's hand: {self.player.hand.join_cards()}")
-        display_underline()
+        self.renderer.prompt(
+            f"Dealer's hand: {self.dealer.hand.join_cards()}"
+        )
+        self.renderer.prompt(
+            f"Player's hand: {self.player.hand.join_cards()}"
+        )
+        self.renderer.display_underline()
 
     def display_hand_values(self):
-        prompt(f"Dealer's total is {self.dealer.hand.value()}")
-        prompt(f"Player's total is {self.player.hand.value()}")
-        display_underline()
+        self.renderer.prompt(f"Dealer's total is {self.dealer.hand.value()}")
+        self.renderer.prompt(f"Player's total is {self.player.hand.value()}")
+        self.renderer.display_underline()
 
     def main_screen(self):
-        clear_screen()
+        self.renderer.clear_screen()
         self.display_balance()
-        display_underline()
+        self.renderer.display_underline()
         self.display_hands()
         self.display_hand_values()
 
     def reshuffle_if_low(self):
         cards_remaining = len(self.deck.cards)
-        # allows dealing up to 39 cards (75% penetration) before reshuffle
-        if cards_remaining <= TwentyOneGame.CARDS_LEFT:
-            clear_screen()
-            prompt(f"There are only {cards_remaining} cards left in the deck.")
-            prompt("Shuffling new deck for the next round...")
-            press_to_continue()
+        # allows dealing up to 75% of the cards (penetration) before reshuffle
+        if self.deck.is_low():
+            self.renderer.clear_screen()
+            self.renderer.prompt(
+                f"There are only {cards_remaining} cards left in the deck."
+            )
+            self.renderer.prompt("Shuffling new deck for the next round...")
+            self.renderer.press_to_continue()
             self.deck.reset()
 
     def new_round(self):
@@ -265,25 +561,25 @@ class TwentyOneGame:
     def player_turn(self):
         while True:
             self.main_screen()
-            prompt("Would you like to (h)it or (s)tay? ")
-            decision = input().strip().lower()
-            decision = TwentyOneGame._validate_decision(decision)
+            self.renderer.prompt("Would you like to (h)it or (s)tay? ")
+            hit = self.strategy.should_hit(self)
 
-            if decision in ("hit", "h"):
-                prompt("Player hits. Dealing card...")
-                time.sleep(1)
+            if hit:
+                self.renderer.prompt("Player hits. Dealing card...")
+                self.renderer.pause()
                 self.deck.deal_card(self.player)
 
-            if self.player.hand.is_busted() or (decision in ("s", "stay")):
+            if self.player.hand.is_busted() or not hit:
                 break
 
         self.main_screen()
-        if decision in ("s", "stay"):
-            prompt("Player decides to stay.")
-            press_to_continue()
+        if not hit:
+            self.renderer.prompt("Player decides to stay.")
+            self.renderer.press_to_continue()
 
     def dealer_turn(self):
         self.dealer.hand.reveal_card()
+        self.deck.reveal_hole_card()
 
         while True:
             if self.player.hand.is_busted():
@@ -295,8 +591,8 @@ class TwentyOneGame:
                 break
 
             if self.dealer.hand.value() < TwentyOneGame.DEALER_STAY:
-                prompt("Dealer hits. Dealing card...")
-                time.sleep(1)
+                self.renderer.prompt("Dealer hits. Dealing card...")
+                self.renderer.pause()
                 self.deck.deal_card(self.dealer)
 
     def determine_result(self):
@@ -326,33 +622,36 @@ class TwentyOneGame:
             case "dealer_win":
                 self.player.decrease_balance()
 
+    def record_round(self):
+        if self.recorder:
+            self.recorder.record_round(self)
+
     def display_result(self):
         match self.determine_result():
             case "player_bust":
-                prompt("Player busts. Dealer wins!")
+                self.renderer.prompt("Player busts. Dealer wins!")
             case "dealer_bust":
-                prompt("Dealer busts. Player wins!")
+                self.renderer.prompt("Dealer busts. Player wins!")
             case "player_win":
-                prompt("Player wins!")
+                self.renderer.prompt("Player wins!")
             case "dealer_win":
-                prompt("Dealer wins!")
+                self.renderer.prompt("Dealer wins!")
             case "tie":
-                prompt("It's a tie!")
+                self.renderer.prompt("It's a tie!")
 
-        press_to_continue()
+        self.renderer.press_to_continue()
 
     def display_balance(self):
-        prompt(f"Player's current balance: ${self.player.balance}")
+        self.renderer.prompt(
+            f"Player's current balance: ${self.player.balance}"
+        )
 
     def play_again(self):
-        prompt("Would you like to play again (y/n)?")
-        answer = input().strip().lower()
-        answer = TwentyOneGame._validate_answer(answer)
-
-        return answer in ("yes", "y")
+        self.renderer.prompt("Would you like to play again (y/n)?")
+        return self.strategy.play_again(self)
 
     def start(self):
-        TwentyOneGame.display_welcome_message()
+        self.display_welcome_message()
 
         while True:
             self.player.reset_balance(TwentyOneGame.PLAYER_BALANCE)
@@ -363,14 +662,16 @@ class TwentyOneGame:
                 self.player_turn()
                 self.dealer_turn()
                 self.update_balance()
+                self.record_round()
                 self.main_screen()
                 self.display_result()
 
             if not self.play_again():
                 break
 
-        TwentyOneGame.display_goodbye_message()
+        self.display_goodbye_message()
 
 
-game = TwentyOneGame()
-game.start()
+if __name__ == "__main__":
+    game = TwentyOneGame()
+    game.start()
@@ -0,0 +1,17 @@
+import random
+
+
+SHARDS_PER_WORKER = 4
+
+
+def shard_sizes(total, workers, shards_per_worker=SHARDS_PER_WORKER):
+    # a few shards per worker keeps every worker busy to the end
+    shards = max(1, min(total, workers * shards_per_worker))
+    size, extra = divmod(total, shards)
+    return [size + (1 if shard < extra else 0) for shard in range(shards)]
+
+
+def shard_rng(seed, shard):
+    # every shard owns its RNG, so no shard touches the global state;
+    # seeding from both numbers keeps runs with nearby seeds apart
+    return random.Random(f"{seed}:{shard}")
@@ -0,0 +1,41 @@
+import random
+import unittest
+
+from OO_TTT import BitBoard, Square
+from ttt_mcts import MCTSEngine
+from ttt_ultimate import UltimateBoard
+
+
+class RolloutTest(unittest.TestCase):
+    MARKERS = (Square.COMPUTER_MARKER, Square.HUMAN_MARKER)
+
+    def assert_rollouts_legal(self, board, rollouts=200):
+        engine = MCTSEngine(random.Random(0))
+        engine.markers = RolloutTest.MARKERS
+        make_move = board.make_move
+        played = []
+
+        def checked_move(key, marker):
+            self.assertIn(key, board.unused_squares())
+            played.append(key)
+            make_move(key, marker)
+
+        board.make_move = checked_move
+        for _ in range(rollouts):
+            moves = engine.rollout(board, RolloutTest.MARKERS[0])
+            self.assertTrue(MCTSEngine.is_over(board))
+            for _ in range(moves):
+                board.undo_move()
+            self.assertEqual(board.move_stack, [])
+
+        self.assertTrue(played)
+
+    def test_ultimate_rollouts_only_play_legal_moves(self):
+        self.assert_rollouts_legal(UltimateBoard())
+
+    def test_bitboard_rollouts_only_play_legal_moves(self):
+        self.assert_rollouts_legal(BitBoard(5, 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,288 @@
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from OO_TTT import BitBoard, TTTGame
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class AlphaBetaSearch:
+    WIN_SCORE = 1_000_000
+    EXACT, LOWER, UPPER = range(3)
+    TIMEOUT_CHECK_NODES = 1024
+    MAX_TABLE_ENTRIES = 1_000_000
+    # no game runs longer than this, so bigger scores are always wins
+    MAX_PLY = 1024
+    # heuristic scores stay strictly below every win score
+    MAX_EVALUATION = WIN_SCORE - MAX_PLY - 1
+    # transposition tables per process, kept between searches; zobrist keys
+    # only depend on the size, so every kind of board and win length needs
+    # its own table
+    TABLES = {}
+
+    def __init__(self, board, deadline=None):
+        self.board = board
+        self.deadline = deadline
+        self.table = AlphaBetaSearch.TABLES.setdefault(
+            (type(board), board.size, board.win_length), {}
+        )
+        self.nodes = 0
+
+    def evaluate(self, marker, opponent_marker):
+        score = 0
+
+        for own, other in self.board.line_holdings(marker, opponent_marker):
+            if own:
+                score += 10 ** own
+            else:
+                score -= 10 ** other
+
+        return max(-AlphaBetaSearch.MAX_EVALUATION,
+                   min(score, AlphaBetaSearch.MAX_EVALUATION))
+
+    @staticmethod
+    def is_win_score(score):
+        return abs(score) > AlphaBetaSearch.MAX_EVALUATION
+
+    def ordered_moves(self, marker, opponent_marker, first=None):
+        board = self.board
+        moves = board.unused_squares()
+        preferred = (
+            first,
+            board.center_square,
+            board.find_critical_square(marker),
+            board.find_critical_square(opponent_marker),
+        )
+        front = []
+
+        for key in preferred:
+            if key and key not in front and board.is_unused_square(key):
+                front.append(key)
+
+        return front + [key for key in moves if key not in front]
+
+    def check_deadline(self):
+        self.nodes += 1
+        if (self.deadline and self.nodes % self.TIMEOUT_CHECK_NODES == 0
+                and time.time() > self.deadline):
+            raise SearchTimeout
+
+    @staticmethod
+    def score_to_table(score, ply):
+        # win scores count plies from the root; the table counts from the
+        # node, so an entry holds wherever the position turns up again
+        if score >= AlphaBetaSearch.WIN_SCORE - AlphaBetaSearch.MAX_PLY:
+            return score + ply
+        if score <= AlphaBetaSearch.MAX_PLY - AlphaBetaSearch.WIN_SCORE:
+            return score - ply
+
+        return score
+
+    @staticmethod
+    def score_from_table(score, ply):
+        if score >= AlphaBetaSearch.WIN_SCORE - AlphaBetaSearch.MAX_PLY:
+            return score - ply
+        if score <= AlphaBetaSearch.MAX_PLY - AlphaBetaSearch.WIN_SCORE:
+            return score + ply
+
+        return score
+
+    def probe(self, key, depth, alpha, beta, ply):
+        entry = self.table.get(key)
+        if entry is None:
+            return None, None, alpha, beta
+
+        entry_depth, score, flag, best_move = entry
+        score = AlphaBetaSearch.score_from_table(score, ply)
+        if entry_depth >= depth:
+            if flag == AlphaBetaSearch.EXACT:
+                return score, best_move, alpha, beta
+            if flag == AlphaBetaSearch.LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score, best_move, alpha, beta
+
+        return None, best_move, alpha, beta
+
+    def negamax(self, depth, alpha, beta, markers, ply):
+        self.check_deadline()
+        board = self.board
+        marker, opponent_marker = markers
+
+        if board.last_move_wins():
+            return -(AlphaBetaSearch.WIN_SCORE - ply)
+        if board.is_full():
+            return 0
+        if depth == 0:
+            return self.evaluate(marker, opponent_marker)
+
+        key = (board.zobrist_hash, marker)
+        original_alpha = alpha
+        score, best_move, alpha, beta = self.probe(key, depth, alpha, beta,
+                                                  ply)
+        if score is not None:
+            return score
+
+        best_score = -math.inf
+        for move in self.ordered_moves(marker, opponent_marker, best_move):
+            board.make_move(move, marker)
+            try:
+                score = -self.negamax(depth - 1, -beta, -alpha,
+                                      (opponent_marker, marker), ply + 1)
+            finally:
+                board.undo_move()
+
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = AlphaBetaSearch.UPPER
+        elif best_score >= beta:
+            flag = AlphaBetaSearch.LOWER
+        else:
+            flag = AlphaBetaSearch.EXACT
+        if len(self.table) >= AlphaBetaSearch.MAX_TABLE_ENTRIES:
+            self.table.clear()
+        self.table[key] = (depth,
+                           AlphaBetaSearch.score_to_table(best_score, ply),
+                           flag, best_move)
+        return best_score
+
+    def search_root(self, root_moves, depth, markers):
+        marker, opponent_marker = markers
+        best_score, best_move = -math.inf, None
+
+        for move in root_moves:
+            self.board.make_move(move, marker)
+            try:
+                score = -self.negamax(depth - 1, -math.inf, -best_score,
+                                      (opponent_marker, marker), 1)
+            finally:
+                self.board.undo_move()
+
+            if score > best_score:
+                best_score, best_move = score, move
+
+        return best_score, best_move
+
+    def iterate(self, root_moves, max_depth, markers):
+        # the best (score, move) of every depth that finished in time
+        completed = []
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score, move = self.search_root(root_moves, depth, markers)
+            except SearchTimeout:
+                break
+
+            completed.append((score, move))
+            # search the previous best move first at the next depth
+            root_moves = [move] + [key for key in root_moves if key != move]
+            if AlphaBetaSearch.is_win_score(score):
+                break
+
+        return completed
+
+
+class AlphaBetaEngine:
+    def __init__(self, max_depth=4, budget_ms=None, workers=1):
+        self.max_depth = max_depth
+        self.budget_ms = budget_ms
+        self.workers = workers or os.cpu_count()
+        self._executor = None
+        self.depth_reached = 0
+
+    @staticmethod
+    def search_shard(board_class, size, win_length, history, root_moves,
+                     settings):
+        max_depth, deadline, markers = settings
+        board = board_class(size, win_length)
+        for key, marker in history:
+            board.make_move(key, marker)
+
+        search = AlphaBetaSearch(board, deadline)
+        return search.iterate(root_moves, max_depth, markers)
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        return self._executor
+
+    def deadline(self):
+        if self.budget_ms is None:
+            return None
+
+        return time.time() + self.budget_ms / 1000
+
+    def choose_square(self, board, marker, opponent_marker):
+        markers = (marker, opponent_marker)
+        root_moves = AlphaBetaSearch(board).ordered_moves(marker,
+                                                          opponent_marker)
+        if len(root_moves) == 1:
+            return root_moves[0]
+
+        if self.workers <= 1:
+            search = AlphaBetaSearch(board, self.deadline())
+            results = [search.iterate(root_moves, self.max_depth, markers)]
+        else:
+            results = self.search_in_parallel(board, root_moves, markers)
+
+        return self.best_common_move(results, root_moves[0])
+
+    def best_common_move(self, results, fallback):
+        # heuristic scores only compare at the same depth, so use the
+        # deepest one every worker finished; a proven win or loss is exact
+        results = [completed for completed in results if completed]
+        if not results:
+            self.depth_reached = 0
+            return fallback
+
+        open_depths = [len(completed) for completed in results
+                       if not AlphaBetaSearch.is_win_score(completed[-1][0])]
+        depth = min(open_depths, default=None)
+        candidates = [
+            completed[-1] if depth is None
+            or AlphaBetaSearch.is_win_score(completed[-1][0])
+            else completed[depth - 1]
+            for completed in results
+        ]
+        self.depth_reached = depth or max(map(len, results))
+        return max(candidates, key=lambda result: result[0])[1]
+
+    def search_in_parallel(self, board, root_moves, markers):
+        history = [(key, board.marker_at(key)) for key in board.move_stack]
+        settings = (self.max_depth, self.deadline(), markers)
+        # deal moves round-robin so every worker gets some of the best
+        shards = [root_moves[start::self.workers]
+                  for start in range(self.workers)]
+        futures = [
+            self.executor.submit(AlphaBetaEngine.search_shard, type(board),
+                                 board.size, board.win_length, history,
+                                 shard, settings)
+            for shard in shards if shard
+        ]
+
+        return [future.result() for future in futures]
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+if __name__ == "__main__":
+    engine = AlphaBetaEngine(max_depth=6, budget_ms=2000, workers=None)
+    game = TTTGame(BitBoard, engine, size=5, win_length=4)
+    game.play()
+    engine.close()
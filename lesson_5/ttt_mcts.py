@@ -0,0 +1,130 @@
+import math
+import random
+import time
+
+from OO_TTT import BitBoard, TTTGame
+
+
+class MCTSNode:
+    def __init__(self, key, marker, parent, untried):
+        self.key = key
+        self.marker = marker
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.score = 0.0
+
+    def best_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(
+            self.children,
+            key=lambda child: (
+                child.score / child.visits
+                + exploration * math.sqrt(log_visits / child.visits)
+            ),
+        )
+
+    def most_visited_child(self):
+        return max(self.children, key=lambda child: child.visits)
+
+
+class MCTSEngine:
+    EXPLORATION = math.sqrt(2)
+    WIN_SCORE = 1.0
+    TIE_SCORE = 0.5
+
+    def __init__(self, rng=random, budget_ms=100, exploration=EXPLORATION):
+        self.rng = rng
+        self.budget_ms = budget_ms
+        self.exploration = exploration
+        self.markers = (None, None)
+        self.iterations = 0
+
+    @staticmethod
+    def is_over(board):
+        return board.last_move_wins() or board.is_full()
+
+    @staticmethod
+    def winner(board):
+        if board.last_key is not None and board.last_move_wins():
+            return board.marker_at(board.last_key)
+
+        return None
+
+    def next_marker(self, marker):
+        first, second = self.markers
+        return second if marker == first else first
+
+    def new_node(self, board, key, marker, parent):
+        untried = [] if MCTSEngine.is_over(board) else board.unused_squares()
+        self.rng.shuffle(untried)
+        return MCTSNode(key, marker, parent, untried)
+
+    def rollout(self, board, marker):
+        # legal moves can change with every move (the next sub-board in
+        # ultimate TTT), so they are read again before each one
+        moves = 0
+
+        while not board.is_full():
+            board.make_move(self.rng.choice(board.unused_squares()), marker)
+            moves += 1
+            if board.last_move_wins():
+                break
+            marker = self.next_marker(marker)
+
+        return moves
+
+    def run_iteration(self, root, board):
+        node, moves = root, 0
+
+        while not node.untried and node.children:
+            node = node.best_child(self.exploration)
+            board.make_move(node.key, node.marker)
+            moves += 1
+
+        if node.untried:
+            key = node.untried.pop()
+            marker = self.next_marker(node.marker)
+            board.make_move(key, marker)
+            moves += 1
+            child = self.new_node(board, key, marker, node)
+            node.children.append(child)
+            node = child
+
+        if not MCTSEngine.is_over(board):
+            moves += self.rollout(board, self.next_marker(node.marker))
+
+        winner = MCTSEngine.winner(board)
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.score += MCTSEngine.TIE_SCORE
+            elif winner == node.marker:
+                node.score += MCTSEngine.WIN_SCORE
+            node = node.parent
+
+        for _ in range(moves):
+            board.undo_move()
+
+    def choose_square(self, board, marker, opponent_marker):
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        self.markers = (marker, opponent_marker)
+        # the root belongs to the opponent, who made the last move
+        root = MCTSNode(None, opponent_marker, None, board.unused_squares())
+        self.rng.shuffle(root.untried)
+        self.iterations = 0
+
+        if len(root.untried) == 1:
+            return root.untried[0]
+
+        while time.perf_counter() < deadline or not root.children:
+            self.run_iteration(root, board)
+            self.iterations += 1
+
+        return root.most_visited_child().key
+
+
+if __name__ == "__main__":
+    game = TTTGame(BitBoard, MCTSEngine(budget_ms=500), size=5, win_length=4)
+    game.play()
@@ -0,0 +1,102 @@
+from OO_TTT import (CLASSIC_FULL_MASK, CLASSIC_SIZE, CLASSIC_SQUARES,
+                    TTTGame, classic_mask_for, is_classic_board,
+                    is_classic_line)
+
+
+class MinimaxEngine:
+    def __init__(self):
+        self._table = {}
+        self._moves = {}
+        self._symmetries = MinimaxEngine.symmetry_tables()
+        self.nodes = 0
+        self._negamax(0, 0)
+
+    @classmethod
+    def _symmetry_permutations(cls):
+        size = CLASSIC_SIZE
+        positions = [(row, col) for row in range(size) for col in range(size)]
+        permutations = []
+
+        for transpose in (False, True):
+            for turns in range(4):
+                permutation = []
+                for row, col in positions:
+                    if transpose:
+                        row, col = col, row
+                    for _ in range(turns):
+                        row, col = col, size - 1 - row
+                    permutation.append(row * size + col)
+                permutations.append(permutation)
+
+        return permutations
+
+    @classmethod
+    def symmetry_tables(cls):
+        tables = []
+
+        for permutation in cls._symmetry_permutations():
+            table = []
+            for mask in range(CLASSIC_FULL_MASK + 1):
+                image = 0
+                for index, target in enumerate(permutation):
+                    if mask & (1 << index):
+                        image |= 1 << target
+                table.append(image)
+            tables.append(table)
+
+        return tables
+
+    def _canonical_key(self, own, other):
+        return min((table[own] << 9) | table[other]
+                   for table in self._symmetries)
+
+    def _negamax(self, own, other):
+        self.nodes += 1
+        occupied = own | other
+        free_squares = (CLASSIC_FULL_MASK & ~occupied).bit_count()
+        # quicker wins score higher, slower losses score less negative
+        if is_classic_line(other):
+            return -(free_squares + 1)
+        if not free_squares:
+            return 0
+
+        key = self._canonical_key(own, other)
+        if key in self._table:
+            return self._table[key]
+
+        best = None
+        for square in CLASSIC_SQUARES:
+            bit = 1 << (square - 1)
+            if occupied & bit:
+                continue
+            score = -self._negamax(other, own | bit)
+            if best is None or score > best:
+                best = score
+
+        self._table[key] = best
+        return best
+
+    def choose_square(self, board, marker, opponent_marker):
+        if not is_classic_board(board):
+            return None
+
+        own = classic_mask_for(board, marker)
+        other = classic_mask_for(board, opponent_marker)
+        if (own, other) in self._moves:
+            return self._moves[(own, other)]
+
+        best_key, best_score = None, None
+
+        for key in board.unused_squares():
+            bit = 1 << (key - 1)
+            score = -self._negamax(other, own | bit)
+            if best_score is None or score > best_score:
+                best_key, best_score = key, score
+
+        self._moves[(own, other)] = best_key
+        return best_key
+
+
+if __name__ == "__main__":
+    game = TTTGame(engine=MinimaxEngine())
+    game.play()
@@ -0,0 +1,128 @@
+import mmap
+import os
+import stat
+import tempfile
+
+from OO_TTT import (CLASSIC_FULL_MASK, CLASSIC_SQUARES, TTTGame,
+                    classic_mask_for, is_classic_board, is_classic_line)
+
+
+class OpeningBook:
+    # base-3 index contribution of each occupancy mask
+    TERNARY = tuple(
+        sum(3 ** index for index in range(9) if mask & (1 << index))
+        for mask in range(CLASSIC_FULL_MASK + 1)
+    )
+    ENTRIES = 3 ** len(CLASSIC_SQUARES)
+    MOVE_BITS = 0x0F
+    OUTCOME_SHIFT = 4
+    UNKNOWN, WIN, DRAW, LOSS = range(4)
+    # a win for the player who just moved is a loss for the one to move
+    FLIPPED = {WIN: LOSS, DRAW: DRAW, LOSS: WIN}
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "ttt_opening_book.bin")
+
+    @staticmethod
+    def index_of(own, other):
+        return OpeningBook.TERNARY[own] + 2 * OpeningBook.TERNARY[other]
+
+    @classmethod
+    def _solve(cls, own, other, table):
+        index = cls.index_of(own, other)
+        if table[index]:
+            return table[index] >> cls.OUTCOME_SHIFT
+
+        occupied = own | other
+        if is_classic_line(other):
+            outcome, best_move = cls.LOSS, 0
+        elif occupied == CLASSIC_FULL_MASK:
+            outcome, best_move = cls.DRAW, 0
+        else:
+            outcome, best_move = None, 0
+            for key in CLASSIC_SQUARES:
+                bit = 1 << (key - 1)
+                if occupied & bit:
+                    continue
+                result = cls.FLIPPED[cls._solve(other, own | bit, table)]
+                if outcome is None or result < outcome:
+                    outcome, best_move = result, key
+
+        table[index] = (outcome << cls.OUTCOME_SHIFT) | best_move
+        return outcome
+
+    @classmethod
+    def build(cls, path=DEFAULT_PATH):
+        table = bytearray(cls.ENTRIES)
+        cls._solve(0, 0, table)
+        return cls.write_table(path, table)
+
+    @staticmethod
+    def file_mode(path):
+        # keep the mode of the file being replaced, or give a new file the
+        # mode open() would
+        try:
+            return stat.S_IMODE(os.stat(path).st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+    @staticmethod
+    def write_table(path, table):
+        # other processes may have the old file mapped, so never truncate it:
+        # write a sibling file and swap it into place in one step
+        directory = os.path.dirname(os.path.abspath(path))
+        descriptor, temp_path = tempfile.mkstemp(dir=directory,
+                                                 suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as table_file:
+                table_file.write(table)
+            # mkstemp makes the file private; the table is meant to be shared
+            os.chmod(temp_path, OpeningBook.file_mode(path))
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+        return path
+
+
+class OpeningBookEngine:
+    def __init__(self, path=OpeningBook.DEFAULT_PATH):
+        if not os.path.exists(path):
+            OpeningBook.build(path)
+
+        self._table = OpeningBookEngine.load(path)
+
+    @staticmethod
+    def load(path):
+        with open(path, "rb") as book_file:
+            table = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(table) != OpeningBook.ENTRIES:
+            table.close()
+            raise ValueError(f"{path} is not a 3x3 move table")
+
+        return table
+
+    def lookup(self, own, other):
+        entry = self._table[OpeningBook.index_of(own, other)]
+        return (entry & OpeningBook.MOVE_BITS,
+                entry >> OpeningBook.OUTCOME_SHIFT)
+
+    def choose_square(self, board, marker, opponent_marker):
+        if not is_classic_board(board):
+            return None
+
+        own = classic_mask_for(board, marker)
+        other = classic_mask_for(board, opponent_marker)
+        move, _ = self.lookup(own, other)
+        return move or None
+
+    def close(self):
+        self._table.close()
+
+
+if __name__ == "__main__":
+    game = TTTGame(engine=OpeningBookEngine())
+    game.play()
@@ -0,0 +1,190 @@
+import os
+import random
+
+from OO_TTT import HeuristicEngine, RandomEngine
+from ttt_self_play import SelfPlayMatch
+
+
+class GameRecord:
+    TIE, FIRST_PLAYER_WIN, SECOND_PLAYER_WIN = range(3)
+    HUMAN, COMPUTER = range(2)
+    # self-play seat 0 plays the human's marker and seat 1 the computer's
+    SEAT_MOVERS = (HUMAN, COMPUTER)
+    MAX_MOVES = 9
+    MOVE_BITS = 0x0F
+    RESULT_SHIFT = 4
+    FIRST_MOVER_SHIFT = 6
+
+    def __init__(self, moves, result, first_mover):
+        self.moves = moves
+        self.result = result
+        self.first_mover = first_mover
+
+    @classmethod
+    def from_game(cls, game):
+        first_mover = (cls.HUMAN if game.first_player == game.human
+                       else cls.COMPUTER)
+        second_player = game.toggle_player(game.first_player)
+
+        if game.is_winner(game.first_player):
+            result = cls.FIRST_PLAYER_WIN
+        elif game.is_winner(second_player):
+            result = cls.SECOND_PLAYER_WIN
+        else:
+            result = cls.TIE
+
+        return cls(list(game.board.move_stack), result, first_mover)
+
+    @staticmethod
+    def payload_length(header):
+        return ((header & GameRecord.MOVE_BITS) + 1) // 2
+
+    def encode(self):
+        if len(self.moves) > GameRecord.MAX_MOVES:
+            raise ValueError("game records only hold 3x3 games")
+
+        header = (len(self.moves)
+                  | self.result << GameRecord.RESULT_SHIFT
+                  | self.first_mover << GameRecord.FIRST_MOVER_SHIFT)
+        payload = bytearray(GameRecord.payload_length(header))
+
+        # two moves per byte, square keys stored as 0-8
+        for index, key in enumerate(self.moves):
+            payload[index // 2] |= (key - 1) << (4 * (index % 2))
+
+        return bytes([header]) + payload
+
+    @classmethod
+    def decode(cls, header, payload):
+        moves = [
+            ((payload[index // 2] >> (4 * (index % 2))) & cls.MOVE_BITS) + 1
+            for index in range(header & cls.MOVE_BITS)
+        ]
+        result = (header >> cls.RESULT_SHIFT) & 0x03
+        first_mover = (header >> cls.FIRST_MOVER_SHIFT) & 0x01
+        return cls(moves, result, first_mover)
+
+
+class GameRecordWriter:
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, path):
+        self._file = open(path, "ab", buffering=GameRecordWriter.BUFFER_SIZE)
+
+    def write(self, record):
+        self._file.write(record.encode())
+
+    def record_game(self, game):
+        self.write(GameRecord.from_game(game))
+
+    def record_self_play(self, moves, winner, first):
+        if winner is None:
+            result = GameRecord.TIE
+        elif winner == first:
+            result = GameRecord.FIRST_PLAYER_WIN
+        else:
+            result = GameRecord.SECOND_PLAYER_WIN
+
+        first_mover = GameRecord.SEAT_MOVERS[first]
+        self.write(GameRecord(list(moves), result, first_mover))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class GameRecordReader:
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, path):
+        self.path = path
+
+    def raw_records(self):
+        leftover = b""
+
+        with open(self.path, "rb") as record_file:
+            while True:
+                chunk = record_file.read(GameRecordReader.CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = leftover + chunk if leftover else chunk
+                position, end = 0, len(data)
+
+                while position < end:
+                    header = data[position]
+                    stop = position + 1 + GameRecord.payload_length(header)
+                    if stop > end:
+                        break
+                    yield header, data[position + 1:stop]
+                    position = stop
+
+                leftover = data[position:]
+
+    def __iter__(self):
+        for header, payload in self.raw_records():
+            yield GameRecord.decode(header, payload)
+
+
+class GameRecordStats:
+    def __init__(self):
+        squares = GameRecord.MAX_MOVES + 1
+        self.games = 0
+        self.opening_counts = [0] * squares
+        self.results_by_opening = [[0, 0, 0] for _ in range(squares)]
+        self.length_histogram = [0] * squares
+
+    def update(self, header, payload):
+        length = header & GameRecord.MOVE_BITS
+        result = (header >> GameRecord.RESULT_SHIFT) & 0x03
+        opening = (payload[0] & GameRecord.MOVE_BITS) + 1 if length else 0
+
+        self.games += 1
+        self.opening_counts[opening] += 1
+        self.results_by_opening[opening][result] += 1
+        self.length_histogram[length] += 1
+
+    @classmethod
+    def from_file(cls, path):
+        stats = cls()
+        for header, payload in GameRecordReader(path).raw_records():
+            stats.update(header, payload)
+
+        return stats
+
+    def win_rate(self, opening):
+        games = self.opening_counts[opening]
+        if not games:
+            return 0.0
+
+        wins = self.results_by_opening[opening][GameRecord.FIRST_PLAYER_WIN]
+        return wins / games
+
+    def display(self):
+        games = self.games or 1
+        print(f"Games recorded: {self.games}")
+        print("Opening  games    share   first player wins")
+        for key in range(1, GameRecord.MAX_MOVES + 1):
+            count = self.opening_counts[key]
+            print(f"{key:>7}  {count:>7}  {count / games:>6.1%}"
+                  f"   {self.win_rate(key):.1%}")
+        print("Length   games")
+        for length, count in enumerate(self.length_histogram):
+            if count:
+                print(f"{length:>6}  {count:>7}")
+
+
+if __name__ == "__main__":
+    PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "ttt_games.bin")
+    rng = random.Random(0)
+    match = SelfPlayMatch([HeuristicEngine(rng), RandomEngine(rng)])
+    with GameRecordWriter(PATH) as writer:
+        match.recorder = writer
+        match.play_games(100_000)
+
+    GameRecordStats.from_file(PATH).display()
@@ -0,0 +1,172 @@
+import array
+import functools
+import os
+import random
+
+from OO_TTT import (CLASSIC_FULL_MASK, CLASSIC_SQUARES, BitBoard, TTTGame,
+                    classic_mask_for, is_classic_board, is_classic_line)
+from ttt_minimax import MinimaxEngine
+from ttt_opening_book import OpeningBook, OpeningBookEngine
+
+
+def masks_of(index):
+    own = other = 0
+
+    for square in range(len(CLASSIC_SQUARES)):
+        index, digit = divmod(index, 3)
+        if digit == 1:
+            own |= 1 << square
+        elif digit == 2:
+            other |= 1 << square
+
+    return own, other
+
+
+@functools.lru_cache(maxsize=None)
+def canonical_index_table():
+    # base-3 index -> index of the smallest of its 8 symmetric images
+    symmetries = MinimaxEngine.symmetry_tables()
+    table = array.array("H", bytes(2 * OpeningBook.ENTRIES))
+
+    for index in range(OpeningBook.ENTRIES):
+        own, other = masks_of(index)
+        table[index] = min(
+            OpeningBook.index_of(symmetry[own], symmetry[other])
+            for symmetry in symmetries
+        )
+
+    return table
+
+
+class TDTrainer:
+    INITIAL_VALUE = 0.5
+    WIN, TIE, LOSS = 1.0, 0.5, 0.0
+    BATCH_SIZE = 10_000
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                "ttt_policy.bin")
+
+    def __init__(self, rng=random, learning_rate=0.2, exploration=0.3):
+        # values of afterstates, seen from the player who just moved
+        self.values = array.array(
+            "d", [TDTrainer.INITIAL_VALUE] * OpeningBook.ENTRIES
+        )
+        self.canonical = canonical_index_table()
+        self.rng = rng
+        self.learning_rate = learning_rate
+        self.exploration = exploration
+        self.games_played = 0
+
+    def afterstate(self, own, other):
+        return self.canonical[OpeningBook.index_of(own, other)]
+
+    def greedy_move(self, own, other):
+        values, occupied = self.values, own | other
+        best_key, best_state, best_value = None, None, -1.0
+
+        for key in CLASSIC_SQUARES:
+            bit = 1 << (key - 1)
+            if occupied & bit:
+                continue
+            state = self.afterstate(own | bit, other)
+            if values[state] > best_value:
+                best_key, best_state, best_value = key, state, values[state]
+
+        return best_key, best_state
+
+    def exploring_move(self, own, other):
+        occupied = own | other
+        free = [key for key in CLASSIC_SQUARES
+                if not occupied & (1 << (key - 1))]
+        key = self.rng.choice(free)
+        return key, self.afterstate(own | (1 << (key - 1)), other)
+
+    def learn(self, state, target):
+        if state is not None:
+            self.values[state] += self.learning_rate * (
+                target - self.values[state]
+            )
+
+    def play_episode(self, exploration):
+        masks, previous, player = [0, 0], [None, None], 0
+
+        while True:
+            own, other = masks[player], masks[1 - player]
+            if self.rng.random() < exploration:
+                key, state = self.exploring_move(own, other)
+            else:
+                key, state = self.greedy_move(own, other)
+            own |= 1 << (key - 1)
+            masks[player] = own
+
+            if is_classic_line(own):
+                self.values[state] = TDTrainer.WIN
+                self.learn(previous[player], TDTrainer.WIN)
+                self.learn(previous[1 - player], TDTrainer.LOSS)
+                return
+            if own | other == CLASSIC_FULL_MASK:
+                self.values[state] = TDTrainer.TIE
+                self.learn(previous[player], TDTrainer.TIE)
+                self.learn(previous[1 - player], TDTrainer.TIE)
+                return
+
+            self.learn(previous[player], self.values[state])
+            previous[player] = state
+            player = 1 - player
+
+    def train(self, games, batch_size=BATCH_SIZE):
+        exploration = self.exploration
+
+        while games > 0:
+            batch = min(batch_size, games)
+            for _ in range(batch):
+                self.play_episode(exploration)
+            games -= batch
+            self.games_played += batch
+            # explore less as the value estimates settle
+            exploration *= 0.8
+
+        return self
+
+    def choose_square(self, board, marker, opponent_marker):
+        if not is_classic_board(board):
+            return None
+
+        own = classic_mask_for(board, marker)
+        other = classic_mask_for(board, opponent_marker)
+        key, _ = self.greedy_move(own, other)
+        return key
+
+    def policy_table(self):
+        table = bytearray(OpeningBook.ENTRIES)
+        stack = [(0, 0)]
+
+        while stack:
+            own, other = stack.pop()
+            index = OpeningBook.index_of(own, other)
+            occupied = own | other
+            if (table[index] or is_classic_line(other)
+                    or occupied == CLASSIC_FULL_MASK):
+                continue
+
+            table[index], _ = self.greedy_move(own, other)
+            for key in CLASSIC_SQUARES:
+                bit = 1 << (key - 1)
+                if not occupied & bit:
+                    stack.append((other, own | bit))
+
+        return table
+
+    def export_policy(self, path=DEFAULT_PATH):
+        return OpeningBook.write_table(path, self.policy_table())
+
+
+class PolicyTableEngine(OpeningBookEngine):
+    def __init__(self, path=TDTrainer.DEFAULT_PATH):
+        self._table = OpeningBookEngine.load(path)
+
+
+if __name__ == "__main__":
+    trainer = TDTrainer(random.Random(0)).train(50_000)
+    trainer.export_policy()
+    game = TTTGame(BitBoard, PolicyTableEngine())
+    game.play()
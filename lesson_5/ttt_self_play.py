@@ -0,0 +1,154 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from OO_TTT import BitBoard, HeuristicEngine, RandomEngine, Square
+from ttt_alpha_beta import AlphaBetaEngine
+from ttt_mcts import MCTSEngine
+from ttt_minimax import MinimaxEngine
+from shards import shard_rng, shard_sizes
+from ttt_opening_book import OpeningBookEngine
+
+
+class SelfPlayStats:
+    def __init__(self):
+        self.wins = [0, 0]
+        self.ties = 0
+        self.first_player_wins = 0
+        self.second_player_wins = 0
+
+    @property
+    def games(self):
+        return sum(self.wins) + self.ties
+
+    def record(self, winner, first):
+        if winner is None:
+            self.ties += 1
+            return
+
+        self.wins[winner] += 1
+        if winner == first:
+            self.first_player_wins += 1
+        else:
+            self.second_player_wins += 1
+
+    def merge(self, other):
+        self.wins = [mine + theirs
+                     for mine, theirs in zip(self.wins, other.wins)]
+        self.ties += other.ties
+        self.first_player_wins += other.first_player_wins
+        self.second_player_wins += other.second_player_wins
+        return self
+
+    def display(self, names):
+        games = self.games or 1
+        print(f"Games played: {self.games}")
+        for name, wins in zip(names, self.wins):
+            print(f"  {name} wins: {wins} ({wins / games:.1%})")
+        print(f"  ties: {self.ties} ({self.ties / games:.1%})")
+        print(f"  first player wins: {self.first_player_wins} "
+              f"({self.first_player_wins / games:.1%})")
+        print(f"  second player wins: {self.second_player_wins} "
+              f"({self.second_player_wins / games:.1%})")
+
+
+class SelfPlayMatch:
+    MARKERS = (Square.HUMAN_MARKER, Square.COMPUTER_MARKER)
+
+    def __init__(self, engines, size=3, win_length=3, rng=random):
+        self.engines = engines
+        # engines that only know 3x3 return None; play on like TTTGame does
+        self.fallback = HeuristicEngine(rng)
+        self.board = BitBoard(size, win_length)
+        self.stats = SelfPlayStats()
+        self.recorder = None
+
+    def play_game(self, first):
+        board = self.board
+        board.reset()
+        current = first
+
+        while True:
+            marker = SelfPlayMatch.MARKERS[current]
+            opponent_marker = SelfPlayMatch.MARKERS[1 - current]
+            choice = self.engines[current].choose_square(
+                board, marker, opponent_marker
+            )
+            if not choice:
+                choice = self.fallback.choose_square(board, marker,
+                                                     opponent_marker)
+            board.mark_square_at(choice, marker)
+
+            if board.last_move_wins():
+                return current
+            if board.is_full():
+                return None
+
+            current = 1 - current
+
+    def play_games(self, games, first=0):
+        for _ in range(games):
+            winner = self.play_game(first)
+            self.stats.record(winner, first)
+            if self.recorder:
+                self.recorder.record_self_play(self.board.move_stack,
+                                               winner, first)
+            first = 1 - first
+
+        return self.stats
+
+
+class SelfPlayHarness:
+    STRATEGIES = {
+        "random": RandomEngine,
+        "heuristic": HeuristicEngine,
+        "minimax": MinimaxEngine,
+        "book": OpeningBookEngine,
+        "mcts": MCTSEngine,
+        "alphabeta": AlphaBetaEngine,
+    }
+    SEEDED_STRATEGIES = (RandomEngine, MCTSEngine)
+
+    def __init__(self, strategies, size=3, win_length=3, workers=None):
+        self.strategies = strategies
+        self.size = size
+        self.win_length = win_length
+        self.workers = workers or os.cpu_count()
+
+    @staticmethod
+    def build_engine(name, rng):
+        engine_class = SelfPlayHarness.STRATEGIES[name]
+        if issubclass(engine_class, SelfPlayHarness.SEEDED_STRATEGIES):
+            return engine_class(rng)
+
+        return engine_class()
+
+    @staticmethod
+    def play_shard(strategies, size, win_length, games, seed, shard):
+        rng = shard_rng(seed, shard)
+        engines = [SelfPlayHarness.build_engine(name, rng)
+                   for name in strategies]
+        match = SelfPlayMatch(engines, size, win_length, rng)
+        # alternate shards so each strategy opens half the games
+        return match.play_games(games, first=shard % 2)
+
+    def run(self, games, seed=0):
+        sizes = shard_sizes(games, self.workers)
+        stats = SelfPlayStats()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(SelfPlayHarness.play_shard, self.strategies,
+                                self.size, self.win_length, shard_games,
+                                seed, shard)
+                for shard, shard_games in enumerate(sizes)
+            ]
+            for future in futures:
+                stats.merge(future.result())
+
+        return stats
+
+
+if __name__ == "__main__":
+    harness = SelfPlayHarness(("heuristic", "random"))
+    harness.run(1_000_000).display(harness.strategies)
@@ -0,0 +1,161 @@
+import asyncio
+
+from OO_TTT import BitBoard, Square, TTTGame
+
+
+class MatchSession:
+    EMPTY_SQUARE = "."
+
+    def __init__(self, engine=None):
+        self.game = TTTGame(BitBoard, engine)
+        self.is_over = False
+
+    def board_line(self):
+        board = self.game.board
+        markers = [board.marker_at(key) for key in board.keys]
+        return "BOARD " + "".join(
+            MatchSession.EMPTY_SQUARE if marker == Square.INITIAL_MARKER
+            else marker
+            for marker in markers
+        )
+
+    def prompt_lines(self):
+        choices = " ".join(str(key)
+                           for key in self.game.board.unused_squares())
+        return [self.board_line(), f"YOUR MOVE {choices}"]
+
+    def welcome(self):
+        return [
+            "HELLO Welcome to Tic Tac Toe!",
+            f"INFO The first player to win {TTTGame.MATCH_GOAL} "
+            "games wins the match.",
+            "INFO Commands: MOVE <square>, BOARD, SCORE, QUIT",
+        ] + self.start_game()
+
+    def start_game(self):
+        game = self.game
+        game.board.reset()
+        lines = []
+
+        if game.first_player == game.computer:
+            lines.append(self.computer_turn())
+
+        return lines + self.prompt_lines()
+
+    def computer_turn(self):
+        self.game.computer_moves()
+        return f"COMPUTER {self.game.board.last_key}"
+
+    def score_line(self):
+        game = self.game
+        return f"SCORE {game.human.score} {game.computer.score}"
+
+    def finish_game(self):
+        game = self.game
+        game.update_match_score()
+
+        if game.is_winner(game.human):
+            result = "RESULT win"
+        elif game.is_winner(game.computer):
+            result = "RESULT loss"
+        else:
+            result = "RESULT tie"
+        lines = [self.board_line(), result, self.score_line()]
+
+        if game.match_over():
+            self.is_over = True
+            won = game.is_match_winner(game.human)
+            return lines + ["MATCH " + ("won" if won else "lost")]
+
+        game.first_player = game.toggle_player(game.first_player)
+        return lines + self.start_game()
+
+    def human_turn(self, argument):
+        game = self.game
+        try:
+            key = int(argument)
+        except ValueError:
+            return ["ERROR not a square"]
+
+        if key not in game.board.keys or not game.board.is_unused_square(key):
+            return ["ERROR square not available"]
+
+        game.board.mark_square_at(key, game.human.marker)
+        if game.is_game_over():
+            return self.finish_game()
+
+        lines = [self.computer_turn()]
+        if game.is_game_over():
+            return lines + self.finish_game()
+
+        return lines + self.prompt_lines()
+
+    def respond(self, line):
+        command, _, argument = line.strip().partition(" ")
+
+        match command.upper():
+            case "MOVE":
+                return self.human_turn(argument.strip())
+            case "BOARD":
+                return self.prompt_lines()
+            case "SCORE":
+                return [self.score_line()]
+            case "QUIT":
+                self.is_over = True
+                return ["BYE Thanks for playing Tic Tac Toe! Goodbye!"]
+            case _:
+                return ["ERROR unknown command"]
+
+
+class TTTServer:
+    HOST = "127.0.0.1"
+    PORT = 8765
+    MAX_LINE_LENGTH = 256
+    BACKLOG = 4096
+
+    def __init__(self, engine=None, host=HOST, port=PORT):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.active_matches = 0
+
+    @staticmethod
+    async def send(writer, lines):
+        writer.write("".join(f"{line}\n" for line in lines).encode())
+        await writer.drain()
+
+    async def handle(self, reader, writer):
+        session = MatchSession(self.engine)
+        self.active_matches += 1
+
+        try:
+            await TTTServer.send(writer, session.welcome())
+            while not session.is_over:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = session.respond(line.decode(errors="replace"))
+                await TTTServer.send(writer, reply)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.active_matches -= 1
+            writer.close()
+
+    async def start(self):
+        return await asyncio.start_server(
+            self.handle, self.host, self.port,
+            limit=self.MAX_LINE_LENGTH, backlog=self.BACKLOG,
+        )
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(TTTServer().serve_forever())
+    except KeyboardInterrupt:
+        pass
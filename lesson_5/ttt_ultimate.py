@@ -0,0 +1,311 @@
+from OO_TTT import (CLASSIC_FULL_MASK, CLASSIC_LINE_MASKS, Board, Square,
+                    SquaresView, TTTGame, clear_screen, is_classic_line,
+                    mask_line_holdings, zobrist_table)
+from ttt_mcts import MCTSEngine
+
+
+SUB_MASK = CLASSIC_FULL_MASK
+
+
+def completing_squares(mask):
+    return sum(1 << index for index in range(9)
+               if not mask & (1 << index)
+               and is_classic_line(mask | (1 << index)))
+
+
+def key_of(sub, index):
+    row = sub // 3 * 3 + index // 3
+    col = sub % 3 * 3 + index % 3
+    return row * 9 + col + 1
+
+
+def sub_board_keys(sub, free):
+    return tuple(key_of(sub, index) for index in range(9)
+                 if free & (1 << index))
+
+
+def sub_board_rows():
+    # winning rows never cross from one sub-board into the next
+    return tuple(tuple(key_of(sub, key - 1) for key in row)
+                 for sub in range(9) for row in Board.POSSIBLE_WINNING_ROWS)
+
+
+def row_indices_by_square(rows):
+    indices_by_square = {key: [] for key in range(1, 82)}
+    for index, row in enumerate(rows):
+        for key in row:
+            indices_by_square[key].append(index)
+
+    return {key: tuple(indices)
+            for key, indices in indices_by_square.items()}
+
+
+class UltimateBoard(Board):
+    SUB_BOARDS = 9
+    SUB_MASK = SUB_MASK
+    CENTER_INDEX = 4
+    # per 3x3 mask: does it hold a line, and which squares would finish one
+    IS_LINE = tuple(is_classic_line(mask) for mask in range(SUB_MASK + 1))
+    COMPLETING = tuple(completing_squares(mask)
+                       for mask in range(SUB_MASK + 1))
+    # keys run 1-81 row by row across the big grid
+    SUB_OF = (None,) + tuple(
+        (row // 3) * 3 + col // 3 for row in range(9) for col in range(9)
+    )
+    INDEX_OF = (None,) + tuple(
+        (row % 3) * 3 + col % 3 for row in range(9) for col in range(9)
+    )
+    KEY_OF = tuple(tuple(key_of(sub, index) for index in range(9))
+                   for sub in range(SUB_BOARDS))
+    SUB_KEYS = tuple(
+        tuple(sub_board_keys(sub, free) for free in range(SUB_MASK + 1))
+        for sub in range(SUB_BOARDS)
+    )
+    ROWS = sub_board_rows()
+    ROW_INDICES_BY_SQUARE = row_indices_by_square(ROWS)
+
+    def __init__(self, size=SUB_BOARDS, win_length=3):
+        if (size, win_length) != (UltimateBoard.SUB_BOARDS, 3):
+            raise ValueError("an ultimate board is 9x9, three in a row")
+
+        super().__init__(size, win_length)
+        self.square_lines = UltimateBoard.ROW_INDICES_BY_SQUARE
+
+    def reset(self):
+        self.masks = {}
+        self.occupied = 0
+        self.macro_masks = {}
+        self.closed = 0
+        self.next_board = None
+        self.reset_move_stack()
+
+    def reset_move_stack(self):
+        super().reset_move_stack()
+        # move_stack holds keys like Board's; what undo_move restores
+        # besides the key goes on its own stack
+        self.undo_stack = []
+
+    def reset_line_counts(self, *_):
+        # the sub-board and macro masks stand in for Board's line counters
+        raise NotImplementedError("UltimateBoard keeps no line counters")
+
+    add_marker_counts = remove_marker_counts = reset_line_counts
+
+    @property
+    def winning_rows(self):
+        return UltimateBoard.ROWS
+
+    @property
+    def squares(self):
+        return SquaresView(self)
+
+    @staticmethod
+    def bit_for(key):
+        sub, index = UltimateBoard.SUB_OF[key], UltimateBoard.INDEX_OF[key]
+        return 1 << (sub * 9 + index)
+
+    @property
+    def keys(self):
+        return range(1, self.SUB_BOARDS * self.SUB_BOARDS + 1)
+
+    def sub_board(self, mask, sub):
+        return (mask >> (sub * 9)) & self.SUB_MASK
+
+    def allowed_sub_boards(self):
+        if self.macro_winner() is not None:
+            return ()
+        if self.next_board is not None:
+            return (self.next_board,)
+
+        return tuple(sub for sub in range(self.SUB_BOARDS)
+                     if not self.closed & (1 << sub))
+
+    def legal_mask(self):
+        legal = 0
+        for sub in self.allowed_sub_boards():
+            free = self.SUB_MASK & ~self.sub_board(self.occupied, sub)
+            legal |= free << (sub * 9)
+
+        return legal
+
+    def marker_at(self, key):
+        bit = UltimateBoard.bit_for(key)
+        for marker, mask in self.masks.items():
+            if mask & bit:
+                return marker
+
+        return Square.INITIAL_MARKER
+
+    def count_markers_for(self, player, keys):
+        mask = self.masks.get(player.marker, 0)
+        return sum(1 for key in keys if mask & UltimateBoard.bit_for(key))
+
+    def line_holdings(self, marker, opponent_marker):
+        own = self.masks.get(marker, 0)
+        other = self.masks.get(opponent_marker, 0)
+        holdings = []
+        for sub in range(self.SUB_BOARDS):
+            if not self.closed & (1 << sub):
+                holdings += mask_line_holdings(self.sub_board(own, sub),
+                                               self.sub_board(other, sub),
+                                               CLASSIC_LINE_MASKS)
+
+        # a row of won sub-boards outweighs any row inside one sub-board
+        macro = mask_line_holdings(self.macro_masks.get(marker, 0),
+                                   self.macro_masks.get(opponent_marker, 0),
+                                   CLASSIC_LINE_MASKS)
+        bonus = self.win_length
+        for mine, theirs in macro:
+            holdings.append((mine + bonus if mine else 0,
+                             theirs + bonus if theirs else 0))
+
+        return holdings
+
+    def macro_winner(self):
+        for marker, macro in self.macro_masks.items():
+            if self.IS_LINE[macro]:
+                return marker
+
+        return None
+
+    def display(self):
+        legal = self.legal_mask()
+
+        print()
+        for row in range(9):
+            if row in (3, 6):
+                print("----------+----------+----------")
+            cells = []
+            for col in range(9):
+                key = row * 9 + col + 1
+                marker = self.marker_at(key)
+                if marker != Square.INITIAL_MARKER:
+                    cells.append(f" {marker}")
+                elif legal & UltimateBoard.bit_for(key):
+                    cells.append(f"{key:>2}")
+                else:
+                    cells.append(" .")
+                if col in (2, 5):
+                    cells.append(" |")
+            print(" ".join(cells))
+        for marker, macro in self.macro_masks.items():
+            won = [str(sub + 1) for sub in range(9) if macro & (1 << sub)]
+            if won:
+                print(f"{marker} has won sub-boards {', '.join(won)}")
+        print()
+
+    def make_move(self, key, marker):
+        sub, index = self.SUB_OF[key], self.INDEX_OF[key]
+        bit = 1 << (sub * 9 + index)
+        macro = self.macro_masks.get(marker, 0)
+        self.move_stack.append(key)
+        self.undo_stack.append((self.next_board, self.closed, macro))
+
+        self.place_marker(key, marker)
+        # sub-board results are cached in the macro masks, never rechecked
+        if self.IS_LINE[self.sub_board(self.masks[marker], sub)]:
+            self.macro_masks[marker] = macro | (1 << sub)
+            self.closed |= 1 << sub
+        elif self.sub_board(self.occupied, sub) == self.SUB_MASK:
+            self.closed |= 1 << sub
+
+        self.zobrist_hash ^= self.next_board_key(self.next_board)
+        self.next_board = None if self.closed & (1 << index) else index
+        self.zobrist_hash ^= self.next_board_key(self.next_board)
+        self.zobrist_hash ^= self.zobrist_key(key, marker)
+        self.last_key = key
+
+    def undo_move(self):
+        key = self.move_stack.pop()
+        next_board, closed, macro = self.undo_stack.pop()
+        marker = self.marker_at(key)
+
+        self.clear_marker(key, marker)
+        self.macro_masks[marker] = macro
+        self.closed = closed
+        self.zobrist_hash ^= self.zobrist_key(key, marker)
+        self.zobrist_hash ^= self.next_board_key(self.next_board)
+        self.next_board = next_board
+        self.zobrist_hash ^= self.next_board_key(self.next_board)
+        self.last_key = self.move_stack[-1] if self.move_stack else None
+        return key
+
+    def place_marker(self, key, marker):
+        bit = UltimateBoard.bit_for(key)
+        self.masks[marker] = self.masks.get(marker, 0) | bit
+        self.occupied |= bit
+
+    def clear_marker(self, key, marker):
+        bit = UltimateBoard.bit_for(key)
+        self.masks[marker] &= ~bit
+        self.occupied &= ~bit
+
+    def next_board_key(self, sub):
+        if sub is None:
+            return 0
+
+        return zobrist_table(3, "next board")[sub]
+
+    def zobrist_key(self, key, marker):
+        return zobrist_table(self.SUB_BOARDS, marker)[key - 1]
+
+    def mark_square_at(self, key, marker):
+        self.make_move(key, marker)
+
+    def unused_squares(self):
+        keys = []
+        for sub in self.allowed_sub_boards():
+            free = self.SUB_MASK & ~self.sub_board(self.occupied, sub)
+            keys.extend(self.SUB_KEYS[sub][free])
+
+        return keys
+
+    def is_unused_square(self, key):
+        return bool(self.legal_mask() & UltimateBoard.bit_for(key))
+
+    def is_full(self):
+        return not self.legal_mask()
+
+    def is_winner(self, player):
+        return self.IS_LINE[self.macro_masks.get(player.marker, 0)]
+
+    def last_move_wins(self):
+        if self.last_key is None:
+            return False
+
+        marker = self.marker_at(self.last_key)
+        return self.IS_LINE[self.macro_masks.get(marker, 0)]
+
+    def find_critical_square(self, marker):
+        own = self.masks.get(marker, 0)
+        for sub in self.allowed_sub_boards():
+            free = self.SUB_MASK & ~self.sub_board(self.occupied, sub)
+            finishing = self.COMPLETING[self.sub_board(own, sub)] & free
+            if finishing:
+                return self.KEY_OF[sub][finishing.bit_length() - 1]
+
+        return None
+
+    @property
+    def center_square(self):
+        if self.next_board is None:
+            return None
+
+        return self.KEY_OF[self.next_board][self.CENTER_INDEX]
+
+
+class UltimateTTTGame(TTTGame):
+    def __init__(self, engine=None):
+        super().__init__(UltimateBoard, engine, UltimateBoard.SUB_BOARDS)
+
+    def display_welcome_message(self):
+        clear_screen()
+        print("Welcome to Ultimate Tic Tac Toe!")
+        print("Win three sub-boards in a row. Your square decides which")
+        print("sub-board the other player must play in next.")
+        print()
+
+
+if __name__ == "__main__":
+    game = UltimateTTTGame(MCTSEngine(budget_ms=1000))
+    game.play()
@@ -0,0 +1,161 @@
+import math
+import time
+
+import numpy as np
+
+from oo_twenty_one import TwentyOneGame
+from twenty_one_simulator import TwentyOneSimulator
+
+
+class BankrollChain:
+    TOLERANCE = 1e-12
+    MAX_ROUNDS = 10_000_000
+
+    def __init__(self, win, lose, tie, start=TwentyOneGame.PLAYER_BALANCE,
+                 goal=TwentyOneGame.WINNING_BALANCE):
+        if not math.isclose(win + lose + tie, 1.0, abs_tol=1e-9):
+            raise ValueError("win, lose and tie chances must add up to 1")
+        if not 0 < start < goal:
+            raise ValueError("the start balance must lie between 0 and goal")
+        if win + lose == 0:
+            raise ValueError("a session that only ties never finishes")
+
+        # a balance moves up on a win and down on a loss, with $1 bets;
+        # 0 (is_broke) and goal (is_rich) end the session
+        self.win, self.lose, self.tie = win, lose, tie
+        self.start, self.goal = start, goal
+
+    @classmethod
+    def from_result(cls, result, **limits):
+        rounds = result.rounds
+        return cls(result.player_wins / rounds, result.dealer_wins / rounds,
+                   result.ties / rounds, **limits)
+
+    def solve(self, rhs):
+        # Thomas algorithm on the transient states 1..goal-1:
+        # (1 - tie) x[i] - lose x[i-1] - win x[i+1] = rhs[i]
+        size = self.goal - 1
+        diagonal, below, above = 1 - self.tie, -self.lose, -self.win
+        upper, values = [0.0] * size, [0.0] * size
+
+        pivot = diagonal
+        upper[0], values[0] = above / pivot, rhs[0] / pivot
+        for index in range(1, size):
+            pivot = diagonal - below * upper[index - 1]
+            upper[index] = above / pivot
+            values[index] = (rhs[index] - below * values[index - 1]) / pivot
+
+        for index in range(size - 2, -1, -1):
+            values[index] -= upper[index] * values[index + 1]
+
+        return values
+
+    def ruin_probabilities(self):
+        # balance 1 can lose straight into ruin, which feeds the boundary in
+        rhs = [0.0] * (self.goal - 1)
+        rhs[0] = self.lose
+        return [1.0] + self.solve(rhs) + [0.0]
+
+    def expected_lengths(self):
+        return [0.0] + self.solve([1.0] * (self.goal - 1)) + [0.0]
+
+    @property
+    def ruin_probability(self):
+        return self.ruin_probabilities()[self.start]
+
+    @property
+    def expected_length(self):
+        return self.expected_lengths()[self.start]
+
+    def transforms(self, z):
+        # generating functions E[z**T] of the round T on which the session
+        # ends broke / rich, built from the two roots x of
+        # z (lose + tie x + win x**2) = x; only values no bigger than 1 on
+        # the unit circle are raised to large powers
+        near = 1 - self.tie * z
+        root = np.sqrt(near * near - 4 * z * z * self.win * self.lose)
+        root = np.where(np.abs(near - root) > np.abs(near + root), -root,
+                        root)
+        far = near + root
+        ratio = 4 * z * z * self.win * self.lose / (far * far)
+        down, up = 2 * z * self.lose / far, 2 * z * self.win / far
+        rest = self.goal - self.start
+        ratio_start, ratio_rest = ratio ** self.start, ratio ** rest
+        denominator = 1 - ratio_start * ratio_rest
+
+        return (down ** self.start * (1 - ratio_rest) / denominator,
+                up ** rest * (1 - ratio_start) / denominator)
+
+    def window_estimate(self, tolerance):
+        # the expected length plus the time the slowest mode of the chain
+        # takes to fall below `tolerance`, rounded up to a power of two
+        slowest = self.tie + 2 * math.sqrt(self.win * self.lose) * math.cos(
+            math.pi / self.goal
+        )
+        rounds = self.expected_length
+        if 0 < slowest < 1:
+            rounds += math.log(tolerance) / math.log(slowest)
+
+        return 1 << max(1024, math.ceil(rounds) - 1).bit_length()
+
+    def finish_distribution(self, tolerance=TOLERANCE,
+                            max_rounds=MAX_ROUNDS):
+        # chance that the session ends broke / rich on exactly round n, from
+        # one inverse FFT of the generating functions: O(M log M) time and
+        # O(M) memory for a window of M rounds, whatever the goal. Sessions
+        # running past the window wrap onto its first rounds, so it doubles
+        # until all but `tolerance` finish with a quarter of it to spare.
+        ruin = self.ruin_probability
+        window = self.window_estimate(tolerance)
+        while True:
+            z = np.exp(-2j * np.pi * np.arange(window // 2 + 1) / window)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                ruined, doubled = self.transforms(z)
+            # z = 1 is 0 / 0 for a fair game, but the totals are known
+            ruined[0], doubled[0] = ruin, 1 - ruin
+            ruined = np.fft.irfft(ruined, window)
+            doubled = np.fft.irfft(doubled, window)
+
+            # summed from the far end so the tiny tail keeps its precision
+            left = np.cumsum((ruined + doubled)[::-1])[::-1]
+            rounds = int(np.argmax(left <= tolerance)) or window
+            if rounds <= window * 3 // 4 or window > max_rounds:
+                break
+            window *= 2
+
+        rounds = min(rounds, max_rounds + 1)
+        return ruined[:rounds], doubled[:rounds]
+
+    def display(self, tolerance=TOLERANCE):
+        ruined, doubled = self.finish_distribution(tolerance)
+        finished = np.cumsum(ruined + doubled)
+        print(f"Start ${self.start}, goal ${self.goal}: "
+              f"ruin {self.ruin_probability:.2%}, "
+              f"expected {self.expected_length:.1f} rounds")
+        for share in (0.5, 0.9, 0.99):
+            rounds = int(np.searchsorted(finished, share))
+            print(f"  {share:.0%} of sessions finish within {rounds} rounds")
+
+
+if __name__ == "__main__":
+    result = TwentyOneSimulator(seed=0).run(1_000_000)
+    print(f"Per round: win {result.rate(result.player_wins):.4f}, "
+          f"lose {result.rate(result.dealer_wins):.4f}, "
+          f"tie {result.rate(result.ties):.4f}")
+
+    for start, goal in ((TwentyOneGame.PLAYER_BALANCE,
+                         TwentyOneGame.WINNING_BALANCE), (50, 100)):
+        chain = BankrollChain.from_result(result, start=start, goal=goal)
+        chain.display()
+
+    chain = BankrollChain.from_result(result, start=2_500, goal=5_000)
+    begin = time.perf_counter()
+    ruin, length = chain.ruin_probability, chain.expected_length
+    elapsed = time.perf_counter() - begin
+    print(f"Start $2500, goal $5000: ruin {ruin:.2%}, expected "
+          f"{length:,.0f} rounds, solved in {elapsed * 1000:.1f} ms")
+    begin = time.perf_counter()
+    ruined, _ = chain.finish_distribution()
+    elapsed = time.perf_counter() - begin
+    print(f"  finish distribution over {len(ruined):,} rounds "
+          f"in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,86 @@
+import functools
+import time
+
+from oo_twenty_one import Card, Shoe, TwentyOneGame
+from twenty_one_strategy import BUST, DEALER_TOTALS, add_card
+from twenty_one_strategy import dealer_outcomes as infinite_deck_outcomes
+
+
+CACHE_SIZE = 1 << 16
+
+
+def rank_counts(cards, value_of):
+    # remaining cards by value, indexed 0..11 so an ace sits at 11
+    counts = bytearray(Card.ACE_VALUE + 1)
+    for card in cards:
+        counts[value_of(card)] += 1
+
+    return bytes(counts)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def dealer_outcomes(total, soft, counts):
+    # chances of finishing on 17..21, with busting in the last slot
+    if total > TwentyOneGame.TWENTY_ONE:
+        return (0.0,) * BUST + (1.0,)
+    if total >= TwentyOneGame.DEALER_STAY:
+        outcomes = [0.0] * (BUST + 1)
+        outcomes[total - TwentyOneGame.DEALER_STAY] = 1.0
+        return tuple(outcomes)
+
+    cards_left = sum(counts)
+    if not cards_left:
+        # the shoe would be reshuffled, so draw from a fresh one
+        return infinite_deck_outcomes(total, soft)
+
+    outcomes = [0.0] * (BUST + 1)
+    remaining = bytearray(counts)
+    for value, count in enumerate(counts):
+        if not count:
+            continue
+        remaining[value] -= 1
+        drawn = dealer_outcomes(*add_card(total, soft, value),
+                                bytes(remaining))
+        remaining[value] += 1
+        for index, odds in enumerate(drawn):
+            outcomes[index] += count / cards_left * odds
+
+    return tuple(outcomes)
+
+
+class DealerOdds:
+    def __init__(self, deck):
+        self.deck = deck
+
+    def counts(self):
+        cards = list(self.deck.cards)
+        # an unrevealed hole card is still unknown, so it stays in the pool
+        if self.deck.hole_card is not None:
+            cards.append(self.deck.hole_card)
+
+        return rank_counts(cards, self.deck.value_of)
+
+    def distribution(self, up_card):
+        total, soft = add_card(0, False, up_card)
+        outcomes = dealer_outcomes(total, soft, self.counts())
+        return dict(zip(DEALER_TOTALS + ("bust",), outcomes))
+
+    @staticmethod
+    def cache_info():
+        return dealer_outcomes.cache_info()
+
+
+if __name__ == "__main__":
+    shoe = Shoe()
+    odds = DealerOdds(shoe)
+    for attempt in ("cold", "cached"):
+        start = time.perf_counter()
+        table = {up_card: odds.distribution(up_card)
+                 for up_card in range(2, Card.ACE_VALUE + 1)}
+        elapsed = time.perf_counter() - start
+        print(f"{attempt}: all up-cards in {elapsed * 1000:.1f} ms")
+
+    print("up   " + "".join(f"{total:>7}" for total in table[2]))
+    for up_card, outcomes in table.items():
+        print(f"{up_card:>2}   "
+              + "".join(f"{odds:>7.1%}" for odds in outcomes.values()))
@@ -0,0 +1,227 @@
+import array
+import mmap
+import os
+import random
+import struct
+import sys
+
+from oo_twenty_one import NullRenderer, StayOnStrategy, TwentyOneGame
+
+
+class RoundColumns:
+    RESULT_INDEX = {result: index
+                    for index, result in enumerate(TwentyOneGame.RESULTS)}
+    # block header: rounds in the block, card codes in the block
+    HEADER = struct.Struct("<II")
+    # fixed-width columns in file order, then the card codes of each round
+    COLUMNS = (
+        ("balance", "i"),
+        ("result", "B"),
+        ("player_total", "B"),
+        ("dealer_total", "B"),
+        ("player_cards", "B"),
+        ("dealer_cards", "B"),
+    )
+    TYPECODE = dict(COLUMNS)
+    ITEM_SIZE = {name: array.array(typecode).itemsize
+                 for name, typecode in COLUMNS}
+    ALIGNMENT = 4
+    # columns are little-endian on disk, like the header
+    BYTESWAP = sys.byteorder == "big"
+
+    @staticmethod
+    def spans(position, rounds, cards):
+        # byte ranges of every column in a block, and where the block ends
+        spans = {}
+        offset = position + RoundColumns.HEADER.size
+        for name, _ in RoundColumns.COLUMNS:
+            end = offset + RoundColumns.ITEM_SIZE[name] * rounds
+            spans[name] = (offset, end)
+            offset = end
+        spans["cards"] = (offset, offset + cards)
+        offset += cards
+
+        return spans, offset + RoundColumns.padding(offset - position)
+
+    @staticmethod
+    def padding(length):
+        return -length % RoundColumns.ALIGNMENT
+
+    @staticmethod
+    def to_disk(values, count):
+        if RoundColumns.BYTESWAP and values.itemsize > 1:
+            values = values[:count]
+            values.byteswap()
+
+        return memoryview(values)[:count]
+
+    @staticmethod
+    def from_disk(typecode, data):
+        values = array.array(typecode)
+        values.frombytes(data)
+        if RoundColumns.BYTESWAP and values.itemsize > 1:
+            values.byteswap()
+
+        return values
+
+
+class RoundRecorder:
+    CAPACITY = 1 << 16
+    CARDS_PER_ROUND = 8
+
+    def __init__(self, path, capacity=CAPACITY):
+        self._file = open(path, "ab")
+        self.capacity = capacity
+        self.columns = {
+            name: array.array(typecode,
+                              bytes(RoundColumns.ITEM_SIZE[name] * capacity))
+            for name, typecode in RoundColumns.COLUMNS
+        }
+        self.cards = bytearray(capacity * RoundRecorder.CARDS_PER_ROUND)
+        self.rounds = 0
+        self.card_count = 0
+
+    def record_round(self, game):
+        player = game.player.hand.codes()
+        dealer = game.dealer.hand.codes()
+        dealt = len(player) + len(dealer)
+        if (self.rounds == self.capacity
+                or self.card_count + dealt > len(self.cards)):
+            self.flush()
+        start, end = self.card_count, self.card_count + dealt
+
+        index, columns = self.rounds, self.columns
+        columns["balance"][index] = game.player.balance
+        columns["result"][index] = RoundColumns.RESULT_INDEX[
+            game.determine_result()
+        ]
+        columns["player_total"][index] = game.player.hand.value()
+        columns["dealer_total"][index] = game.dealer.hand.value()
+        columns["player_cards"][index] = len(player)
+        columns["dealer_cards"][index] = len(dealer)
+        self.cards[start:end] = player + dealer
+        self.rounds += 1
+        self.card_count = end
+
+    def flush(self):
+        if not self.rounds:
+            return
+
+        write = self._file.write
+        write(RoundColumns.HEADER.pack(self.rounds, self.card_count))
+        length = RoundColumns.HEADER.size
+        for name, _ in RoundColumns.COLUMNS:
+            column = RoundColumns.to_disk(self.columns[name], self.rounds)
+            write(column)
+            length += column.nbytes
+        write(memoryview(self.cards)[:self.card_count])
+        length += self.card_count
+        write(bytes(RoundColumns.padding(length)))
+
+        self.rounds = 0
+        self.card_count = 0
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+class RoundHistory:
+    def __init__(self, path):
+        self.path = path
+
+    def blocks(self):
+        with open(self.path, "rb") as history_file:
+            if not os.fstat(history_file.fileno()).st_size:
+                return
+            with mmap.mmap(history_file.fileno(), 0,
+                           access=mmap.ACCESS_READ) as data:
+                position = 0
+                while position < len(data):
+                    rounds, cards = RoundColumns.HEADER.unpack_from(
+                        data, position
+                    )
+                    spans, position = RoundColumns.spans(position, rounds,
+                                                         cards)
+                    yield data, rounds, spans
+
+    def column(self, name):
+        for data, _, spans in self.blocks():
+            start, end = spans[name]
+            if name == "cards" or RoundColumns.ITEM_SIZE[name] == 1:
+                yield data[start:end]
+            else:
+                yield RoundColumns.from_disk(RoundColumns.TYPECODE[name],
+                                             data[start:end])
+
+    def __len__(self):
+        return sum(rounds for _, rounds, _ in self.blocks())
+
+    def result_counts(self):
+        counts = dict.fromkeys(TwentyOneGame.RESULTS, 0)
+        for results in self.column("result"):
+            for index, result in enumerate(TwentyOneGame.RESULTS):
+                counts[result] += results.count(index)
+
+        return counts
+
+    def average(self, name):
+        rounds = len(self)
+        if not rounds:
+            return 0.0
+
+        return sum(sum(values) for values in self.column(name)) / rounds
+
+    def card_counts(self):
+        counts = [0] * 52
+        for cards in self.column("cards"):
+            for code in range(len(counts)):
+                counts[code] += cards.count(code)
+
+        return counts
+
+    def __iter__(self):
+        names = [name for name, _ in RoundColumns.COLUMNS]
+        for data, rounds, spans in self.blocks():
+            columns = {}
+            for name, typecode in RoundColumns.COLUMNS:
+                start, end = spans[name]
+                columns[name] = RoundColumns.from_disk(typecode,
+                                                       data[start:end])
+            start, end = spans["cards"]
+            cards, position = data[start:end], 0
+
+            for index in range(rounds):
+                row = {name: columns[name][index] for name in names}
+                dealt = row["player_cards"] + row["dealer_cards"]
+                row["player_hand"] = cards[position:
+                                           position + row["player_cards"]]
+                row["dealer_hand"] = cards[position + row["player_cards"]:
+                                           position + dealt]
+                row["result"] = TwentyOneGame.RESULTS[row["result"]]
+                position += dealt
+                yield row
+
+
+if __name__ == "__main__":
+    PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "twenty_one_history.bin")
+    random.seed(0)
+    game = TwentyOneGame.with_shoe(strategy=StayOnStrategy(sessions=10_000),
+                                   renderer=NullRenderer())
+    with RoundRecorder(PATH) as recorder:
+        game.recorder = recorder
+        game.start()
+
+    history = RoundHistory(PATH)
+    print(f"Rounds recorded: {len(history)}")
+    for result, count in history.result_counts().items():
+        print(f"{result:>12}: {count}")
+    print(f"Average player total: {history.average('player_total'):.2f}")
+    print(f"Average dealer total: {history.average('dealer_total'):.2f}")
@@ -0,0 +1,94 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from oo_twenty_one import NullRenderer, StayOnStrategy, TwentyOneGame
+from shards import shard_rng, shard_sizes
+from twenty_one_strategy import BasicStrategyPlayer
+
+
+class TwentyOneStats:
+    def __init__(self):
+        self.results = dict.fromkeys(TwentyOneGame.RESULTS, 0)
+        self.broke_sessions = 0
+        self.rich_sessions = 0
+
+    @property
+    def rounds(self):
+        return sum(self.results.values())
+
+    def record_round(self, game):
+        self.results[game.determine_result()] += 1
+        if game.player.is_broke():
+            self.broke_sessions += 1
+        elif game.player.is_rich():
+            self.rich_sessions += 1
+
+    def merge(self, other):
+        for result, count in other.results.items():
+            self.results[result] += count
+        self.broke_sessions += other.broke_sessions
+        self.rich_sessions += other.rich_sessions
+        return self
+
+    def player_ev(self):
+        rounds = self.rounds or 1
+        won = self.results["player_win"] + self.results["dealer_bust"]
+        lost = self.results["player_bust"] + self.results["dealer_win"]
+        return (won - lost) / rounds
+
+    def display(self):
+        rounds = self.rounds or 1
+        print(f"Rounds played: {self.rounds}")
+        for result, count in self.results.items():
+            print(f"{result:>12}: {count / rounds:.2%}")
+        print(f"Sessions: {self.broke_sessions} broke, "
+              f"{self.rich_sessions} doubled up")
+        print(f"Player EV: {self.player_ev():+.4f} per $1 bet")
+
+
+class TwentyOneHarness:
+    STRATEGIES = {
+        "stay17": StayOnStrategy,
+        "basic": BasicStrategyPlayer,
+    }
+
+    def __init__(self, strategy="basic", decks=None, workers=None):
+        self.strategy = strategy
+        self.decks = decks
+        self.workers = workers or os.cpu_count()
+
+    @staticmethod
+    def play_shard(strategy, decks, sessions, seed, shard):
+        rng = shard_rng(seed, shard)
+        player = TwentyOneHarness.STRATEGIES[strategy](sessions=sessions)
+        if decks is None:
+            game = TwentyOneGame.compact(player, NullRenderer(), rng)
+        else:
+            game = TwentyOneGame.with_shoe(decks, player, NullRenderer(),
+                                           rng=rng)
+
+        stats = TwentyOneStats()
+        game.recorder = stats
+        game.start()
+        return stats
+
+    def run(self, sessions, seed=0):
+        sizes = shard_sizes(sessions, self.workers)
+        stats = TwentyOneStats()
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [
+                executor.submit(TwentyOneHarness.play_shard, self.strategy,
+                                self.decks, shard_sessions, seed, shard)
+                for shard, shard_sessions in enumerate(sizes)
+            ]
+            # merge in shard order so totals never depend on timing
+            for future in futures:
+                stats.merge(future.result())
+
+        return stats
+
+
+if __name__ == "__main__":
+    harness = TwentyOneHarness("basic", decks=6)
+    harness.run(100_000).display()
@@ -0,0 +1,147 @@
+import numpy as np
+
+from oo_twenty_one import Card, Deck, TwentyOneGame
+
+
+class SimulationResult:
+    def __init__(self):
+        self.rounds = 0
+        self.player_wins = 0
+        self.dealer_wins = 0
+        self.ties = 0
+        self.player_busts = 0
+        self.dealer_busts = 0
+
+    def add(self, outcome, player_busted, dealer_busted):
+        self.rounds += outcome.size
+        self.player_wins += int(np.count_nonzero(outcome > 0))
+        self.dealer_wins += int(np.count_nonzero(outcome < 0))
+        self.ties += int(np.count_nonzero(outcome == 0))
+        self.player_busts += int(np.count_nonzero(player_busted))
+        self.dealer_busts += int(np.count_nonzero(dealer_busted))
+
+    def rate(self, count):
+        return count / self.rounds if self.rounds else 0.0
+
+    @property
+    def player_ev(self):
+        return self.rate(self.player_wins - self.dealer_wins)
+
+    @property
+    def player_bust_rate(self):
+        return self.rate(self.player_busts)
+
+    @property
+    def dealer_bust_rate(self):
+        return self.rate(self.dealer_busts)
+
+    def display(self):
+        print(f"Rounds played: {self.rounds}")
+        print(f"Player wins:   {self.rate(self.player_wins):.2%}")
+        print(f"Dealer wins:   {self.rate(self.dealer_wins):.2%}")
+        print(f"Ties:          {self.rate(self.ties):.2%}")
+        print(f"Player busts:  {self.player_bust_rate:.2%}")
+        print(f"Dealer busts:  {self.dealer_bust_rate:.2%}")
+        print(f"Player EV:     {self.player_ev:+.4f} per $1 bet")
+
+
+class TwentyOneSimulator:
+    DECK_VALUES = np.array(
+        [Card(rank, suit).value()
+         for rank in Deck.RANKS for suit in Deck.SUITS],
+        dtype=np.int8,
+    )
+    DECK_SIZE = len(DECK_VALUES)
+    SHOES_PER_BATCH = 100_000
+
+    def __init__(self, player_stay=TwentyOneGame.DEALER_STAY, seed=None):
+        # the player hits below player_stay, like the dealer does below 17
+        self.player_stay = player_stay
+        self.rng = np.random.default_rng(seed)
+
+    def shuffled_shoes(self, count):
+        shoes = np.broadcast_to(self.DECK_VALUES, (count, self.DECK_SIZE))
+        return self.rng.permuted(shoes, axis=1)
+
+    @staticmethod
+    def add_cards(totals, soft_aces, values):
+        totals += values
+        soft_aces += values == Card.ACE_VALUE
+
+        # one new card can push at most two soft aces over the limit
+        for _ in range(2):
+            soften = (totals > TwentyOneGame.TWENTY_ONE) & (soft_aces > 0)
+            totals -= Card.FACE_VALUE * soften
+            soft_aces -= soften
+
+    def draw(self, shoes, cursors, wanted):
+        positions = np.minimum(cursors, self.DECK_SIZE - 1)
+        values = shoes[np.arange(len(shoes)), positions]
+        cursors += wanted
+        return np.where(wanted, values, 0).astype(np.int16)
+
+    def hit_until(self, shoes, cursors, hands, wanted, stay):
+        totals, soft_aces = hands
+
+        while True:
+            hitting = wanted & (totals < stay)
+            if not hitting.any():
+                break
+            self.add_cards(totals, soft_aces,
+                           self.draw(shoes, cursors, hitting))
+
+    def play_round(self, shoes, cursors, active, result):
+        count = len(shoes)
+        player = (np.zeros(count, np.int16), np.zeros(count, np.int16))
+        dealer = (np.zeros(count, np.int16), np.zeros(count, np.int16))
+
+        for _ in range(2):
+            self.add_cards(*player, self.draw(shoes, cursors, active))
+            self.add_cards(*dealer, self.draw(shoes, cursors, active))
+
+        self.hit_until(shoes, cursors, player, active, self.player_stay)
+        player_busted = player[0] > TwentyOneGame.TWENTY_ONE
+        self.hit_until(shoes, cursors, dealer, active & ~player_busted,
+                       TwentyOneGame.DEALER_STAY)
+        dealer_busted = ~player_busted & (dealer[0] > TwentyOneGame.TWENTY_ONE)
+
+        outcome = np.sign(player[0] - dealer[0])
+        outcome[dealer_busted] = 1
+        outcome[player_busted] = -1
+        result.add(outcome[active], player_busted[active],
+                   dealer_busted[active])
+
+    def play_shoes(self, count, rounds, result):
+        shoes = self.shuffled_shoes(count)
+        cursors = np.zeros(count, np.intp)
+        active = np.ones(count, bool)
+
+        while rounds > 0 and active.any():
+            # stop exactly at the requested number of rounds
+            excess = int(active.sum()) - rounds
+            if excess > 0:
+                active[np.flatnonzero(active)[-excess:]] = False
+
+            played = result.rounds
+            self.play_round(shoes, cursors, active, result)
+            rounds -= result.rounds - played
+            # a shoe is finished once the cut card at CARDS_LEFT comes up
+            active &= self.DECK_SIZE - cursors > TwentyOneGame.CARDS_LEFT
+
+        return rounds
+
+    def run(self, rounds):
+        result = SimulationResult()
+
+        while rounds > 0:
+            count = min(TwentyOneSimulator.SHOES_PER_BATCH, rounds)
+            rounds = self.play_shoes(count, rounds, result)
+
+        return result
+
+
+if __name__ == "__main__":
+    for stay in range(12, 19):
+        print(f"Player stays on {stay}:")
+        TwentyOneSimulator(stay, seed=0).run(1_000_000).display()
+        print()
@@ -0,0 +1,167 @@
+import functools
+import time
+
+from oo_twenty_one import (Card, Deck, NullRenderer, Strategy,
+                           TwentyOneGame)
+
+
+# infinite-deck draw probabilities: (card value, chance of drawing it)
+CARD_PROBABILITIES = tuple(
+    (value, [Card(rank, None).value() for rank in Deck.RANKS].count(value)
+     / len(Deck.RANKS))
+    for value in sorted({Card(rank, None).value() for rank in Deck.RANKS})
+)
+DEALER_TOTALS = tuple(range(TwentyOneGame.DEALER_STAY,
+                            TwentyOneGame.TWENTY_ONE + 1))
+BUST = len(DEALER_TOTALS)
+
+
+def add_card(total, soft, value):
+    # soft means an ace is still counted as 11; two never can be at once
+    total += value
+    soft_aces = soft + (value == Card.ACE_VALUE)
+
+    while total > TwentyOneGame.TWENTY_ONE and soft_aces:
+        total -= Card.FACE_VALUE
+        soft_aces -= 1
+
+    return total, soft_aces > 0
+
+
+@functools.lru_cache(maxsize=None)
+def dealer_outcomes(total, soft):
+    # chances of finishing on 17..21, with busting in the last slot
+    outcomes = [0.0] * (BUST + 1)
+    if total > TwentyOneGame.TWENTY_ONE:
+        outcomes[BUST] = 1.0
+    elif total >= TwentyOneGame.DEALER_STAY:
+        outcomes[total - TwentyOneGame.DEALER_STAY] = 1.0
+    else:
+        for value, chance in CARD_PROBABILITIES:
+            for index, odds in enumerate(dealer_outcomes(
+                    *add_card(total, soft, value))):
+                outcomes[index] += chance * odds
+
+    return tuple(outcomes)
+
+
+@functools.lru_cache(maxsize=None)
+def stay_value(total, up_card):
+    outcomes = dealer_outcomes(up_card, up_card == Card.ACE_VALUE)
+    value = outcomes[BUST]
+
+    for dealer_total, chance in zip(DEALER_TOTALS, outcomes):
+        if total > dealer_total:
+            value += chance
+        elif total < dealer_total:
+            value -= chance
+
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def hit_value(total, soft, up_card):
+    value = 0.0
+
+    for card, chance in CARD_PROBABILITIES:
+        new_total, new_soft = add_card(total, soft, card)
+        if new_total > TwentyOneGame.TWENTY_ONE:
+            value -= chance
+        else:
+            value += chance * best_value(new_total, new_soft, up_card)
+
+    return value
+
+
+@functools.lru_cache(maxsize=None)
+def best_value(total, soft, up_card):
+    return max(stay_value(total, up_card), hit_value(total, soft, up_card))
+
+
+class BasicStrategy:
+    UP_CARDS = tuple(value for value, _ in CARD_PROBABILITIES)
+    HARD_TOTALS = range(4, TwentyOneGame.TWENTY_ONE + 1)
+    SOFT_TOTALS = range(Card.ACE_VALUE + 1, TwentyOneGame.TWENTY_ONE + 1)
+
+    def __init__(self):
+        # (player total, soft, dealer up-card value) -> hit?
+        self.table = {}
+        for up_card in BasicStrategy.UP_CARDS:
+            for total in BasicStrategy.HARD_TOTALS:
+                self.table[(total, False, up_card)] = self.solve(
+                    total, False, up_card)
+            for total in BasicStrategy.SOFT_TOTALS:
+                self.table[(total, True, up_card)] = self.solve(
+                    total, True, up_card)
+
+    @staticmethod
+    def solve(total, soft, up_card):
+        return hit_value(total, soft, up_card) > stay_value(total, up_card)
+
+    @staticmethod
+    def hand_state(values):
+        total, soft = 0, False
+        for value in values:
+            total, soft = add_card(total, soft, value)
+
+        return total, soft
+
+    def should_hit(self, total, soft, up_card):
+        if total > TwentyOneGame.TWENTY_ONE:
+            return False
+
+        return self.table[(total, soft, up_card)]
+
+    def expected_value(self):
+        # before the deal: two player cards and the dealer's up-card
+        value = 0.0
+        for up_card, up_chance in CARD_PROBABILITIES:
+            for first, first_chance in CARD_PROBABILITIES:
+                for second, second_chance in CARD_PROBABILITIES:
+                    total, soft = BasicStrategy.hand_state((first, second))
+                    value += (up_chance * first_chance * second_chance
+                              * best_value(total, soft, up_card))
+
+        return value
+
+    def display(self):
+        header = " ".join(f"{'A' if up == Card.ACE_VALUE else up:>2}"
+                          for up in BasicStrategy.UP_CARDS)
+        for soft, totals in ((False, BasicStrategy.HARD_TOTALS),
+                             (True, BasicStrategy.SOFT_TOTALS)):
+            print(f"{'soft' if soft else 'hard':>8}  {header}")
+            for total in totals:
+                row = " ".join(
+                    " H" if self.table[(total, soft, up)] else " S"
+                    for up in BasicStrategy.UP_CARDS
+                )
+                print(f"{total:>8}  {row}")
+            print()
+
+
+class BasicStrategyPlayer(Strategy):
+    def __init__(self, strategy=None, sessions=1):
+        super().__init__(sessions)
+        self.strategy = strategy or BasicStrategy()
+
+    def should_hit(self, game):
+        hand = game.player.hand
+        total, soft = hand.value(), hand.is_soft()
+        up_card = game.dealer.hand.card_values()[0]
+        return self.strategy.should_hit(total, soft, up_card)
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    strategy = BasicStrategy()
+    elapsed = time.perf_counter() - start
+    strategy.display()
+    print(f"Built in {elapsed * 1000:.1f} ms, "
+          f"player EV {strategy.expected_value():+.4f} per $1 bet")
+
+    sessions = 1_000
+    bot = BasicStrategyPlayer(strategy, sessions)
+    start = time.perf_counter()
+    TwentyOneGame.with_shoe(strategy=bot, renderer=NullRenderer()).start()
+    elapsed = time.perf_counter() - start
+    print(f"Bot played {sessions} sessions in {elapsed:.2f} s")
@@ -0,0 +1,158 @@
+import array
+import random
+import time
+
+from oo_twenty_one import CompactCard, Shoe, TwentyOneGame
+from twenty_one_strategy import BasicStrategy, add_card
+
+
+class TwentyOneTable:
+    MAX_SEATS = 7
+    # indices into TwentyOneGame.RESULTS
+    PLAYER_BUST, DEALER_BUST, PLAYER_WIN, DEALER_WIN, TIE = range(5)
+    PAYOUTS = (-1, 1, 1, -1, 0)
+
+    def __init__(self, seats=MAX_SEATS, decks=Shoe.DECKS, policy=None,
+                 counter=None, rng=random):
+        if not 1 <= seats <= TwentyOneTable.MAX_SEATS:
+            raise ValueError(
+                f"a table seats 1 to {TwentyOneTable.MAX_SEATS} players"
+            )
+
+        self.seats = seats
+        self.shoe = Shoe(decks, counter, rng)
+        # policy.should_hit(total, soft, dealer up-card value) -> bool
+        self.policy = policy or BasicStrategy()
+        self.balances = array.array("i", bytes(4 * seats))
+        self.result_counts = array.array(
+            "q", bytes(8 * len(TwentyOneGame.RESULTS))
+        )
+        self.rounds_played = 0
+        self.broke_sessions = self.rich_sessions = 0
+        self.reset_balances()
+
+    def reset_balances(self, balance=TwentyOneGame.PLAYER_BALANCE):
+        for seat in range(self.seats):
+            self.balances[seat] = balance
+
+    def active_seats(self):
+        # like start(), a seat leaves once it is broke or has doubled up
+        return [seat for seat in range(self.seats)
+                if 0 < self.balances[seat] < TwentyOneGame.WINNING_BALANCE]
+
+    def deal(self, seats):
+        draw, values = self.shoe.draw, CompactCard.VALUE
+        hands = [(0, False)] * self.seats
+
+        for seat in seats:
+            hands[seat] = add_card(0, False, values[draw()])
+        up_card = values[draw()]
+        for seat in seats:
+            hands[seat] = add_card(*hands[seat], values[draw()])
+        hole_card = values[draw(hidden=True)]
+
+        return hands, up_card, hole_card
+
+    def play_seats(self, seats, hands, up_card):
+        draw, values = self.shoe.draw, CompactCard.VALUE
+        should_hit = self.policy.should_hit
+
+        for seat in seats:
+            total, soft = hands[seat]
+            while (total <= TwentyOneGame.TWENTY_ONE
+                   and should_hit(total, soft, up_card)):
+                total, soft = add_card(total, soft, values[draw()])
+            hands[seat] = (total, soft)
+
+    def play_dealer(self, up_card, hole_card):
+        draw, values = self.shoe.draw, CompactCard.VALUE
+        total, soft = add_card(*add_card(0, False, up_card), hole_card)
+
+        while total < TwentyOneGame.DEALER_STAY:
+            total, soft = add_card(total, soft, values[draw()])
+
+        return total
+
+    def settle(self, seats, hands, dealer_total):
+        balances, counts = self.balances, self.result_counts
+
+        for seat in seats:
+            total = hands[seat][0]
+            if total > TwentyOneGame.TWENTY_ONE:
+                result = TwentyOneTable.PLAYER_BUST
+            elif dealer_total > TwentyOneGame.TWENTY_ONE:
+                result = TwentyOneTable.DEALER_BUST
+            elif total > dealer_total:
+                result = TwentyOneTable.PLAYER_WIN
+            elif dealer_total > total:
+                result = TwentyOneTable.DEALER_WIN
+            else:
+                result = TwentyOneTable.TIE
+            balances[seat] += TwentyOneTable.PAYOUTS[result]
+            counts[result] += 1
+
+    def play_round(self):
+        seats = self.active_seats()
+        if not seats:
+            return False
+
+        if self.shoe.is_low():
+            self.shoe.reset()
+
+        hands, up_card, hole_card = self.deal(seats)
+        self.play_seats(seats, hands, up_card)
+        self.shoe.reveal_hole_card()
+        # the dealer only plays out the hand if some seat is still standing
+        if any(hands[seat][0] <= TwentyOneGame.TWENTY_ONE for seat in seats):
+            dealer_total = self.play_dealer(up_card, hole_card)
+        else:
+            dealer_total = 0
+        self.settle(seats, hands, dealer_total)
+        self.rounds_played += 1
+        return True
+
+    def rebuy_finished_seats(self):
+        balances = self.balances
+
+        for seat in range(self.seats):
+            if balances[seat] <= 0:
+                self.broke_sessions += 1
+            elif balances[seat] >= TwentyOneGame.WINNING_BALANCE:
+                self.rich_sessions += 1
+            else:
+                continue
+            balances[seat] = TwentyOneGame.PLAYER_BALANCE
+
+    def play(self, rounds, rebuy=True):
+        for _ in range(rounds):
+            if rebuy:
+                self.rebuy_finished_seats()
+            if not self.play_round():
+                break
+
+        return self
+
+    def seat_rounds(self):
+        return sum(self.result_counts)
+
+    def display(self):
+        seat_rounds = self.seat_rounds() or 1
+        print(f"Table rounds: {self.rounds_played}, "
+              f"seat rounds: {self.seat_rounds()}")
+        for name, count in zip(TwentyOneGame.RESULTS, self.result_counts):
+            print(f"{name:>12}: {count / seat_rounds:.2%}")
+        print(f"Sessions: {self.broke_sessions} broke, "
+              f"{self.rich_sessions} doubled up")
+        print(f"Balances: {list(self.balances)}")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    for seats in (1, 3, 7):
+        table = TwentyOneTable(seats)
+        start = time.perf_counter()
+        table.play(100_000)
+        elapsed = time.perf_counter() - start
+        print(f"{seats} seat(s): "
+              f"{table.seat_rounds() / elapsed:,.0f} seat rounds/s")
+    table.display()